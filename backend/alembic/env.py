@@ -0,0 +1,50 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+from app.config import settings
+from app.database import Base
+from app import models  # noqa: F401  (registers every table on Base.metadata)
+
+config = context.config
+
+# The app passes its own connection in and has already configured logging
+connection = config.attributes.get("connection")
+if connection is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"}
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite"
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif connection is not None:
+    run_migrations_online(connection)
+else:
+    engine = engine_from_config(
+        {"sqlalchemy.url": settings.DATABASE_URL},
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool
+    )
+    with engine.connect() as connection:
+        run_migrations_online(connection)
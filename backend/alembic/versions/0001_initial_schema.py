@@ -0,0 +1,172 @@
+"""initial schema
+
+The tables create_all() built before the catalog mirror, so databases from
+that time can be stamped at this revision.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('business_info',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('company_name', sa.String(), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('hours', sa.JSON(), nullable=True),
+    sa.Column('will_call_location', sa.String(), nullable=True),
+    sa.Column('will_call_hours', sa.String(), nullable=True),
+    sa.Column('certifications', sa.JSON(), nullable=True),
+    sa.Column('about_us', sa.Text(), nullable=True),
+    sa.Column('story', sa.Text(), nullable=True),
+    sa.Column('mission', sa.Text(), nullable=True),
+    sa.Column('values', sa.JSON(), nullable=True),
+    sa.Column('founded_year', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_business_info_id', 'business_info', ['id'], unique=False)
+
+    op.create_table('contact_inquiries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('subject', sa.String(), nullable=True),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('inquiry_type', sa.Enum('GENERAL', 'ORDER', 'PRODUCT', 'WHOLESALE', 'PARTNERSHIP', 'SUPPORT', name='inquirytype'), nullable=True),
+    sa.Column('order_number', sa.String(), nullable=True),
+    sa.Column('is_resolved', sa.Integer(), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('resolved_by', sa.String(), nullable=True),
+    sa.Column('admin_notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_contact_inquiries_id', 'contact_inquiries', ['id'], unique=False)
+
+    op.create_table('social_media_links',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('platform', sa.String(), nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('username', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_social_media_links_id', 'social_media_links', ['id'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('password_hash', sa.String(), nullable=False),
+    sa.Column('first_name', sa.String(), nullable=True),
+    sa.Column('last_name', sa.String(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('shopify_customer_id', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_admin', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_users_shopify_customer_id', 'users', ['shopify_customer_id'], unique=True)
+
+    op.create_table('webhook_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('event_id', sa.String(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('headers', sa.JSON(), nullable=True),
+    sa.Column('processed', sa.Boolean(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('retry_count', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_webhook_events_event_id', 'webhook_events', ['event_id'], unique=True)
+    op.create_index('ix_webhook_events_id', 'webhook_events', ['id'], unique=False)
+
+    op.create_table('cart_sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('shopify_checkout_id', sa.String(), nullable=True),
+    sa.Column('shopify_checkout_token', sa.String(), nullable=True),
+    sa.Column('checkout_url', sa.String(), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=True),
+    sa.Column('subtotal', sa.Float(), nullable=True),
+    sa.Column('tax_amount', sa.Float(), nullable=True),
+    sa.Column('shipping_amount', sa.Float(), nullable=True),
+    sa.Column('discount_amount', sa.Float(), nullable=True),
+    sa.Column('discount_codes', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_cart_sessions_id', 'cart_sessions', ['id'], unique=False)
+    op.create_index('ix_cart_sessions_session_id', 'cart_sessions', ['session_id'], unique=True)
+
+    op.create_table('cart_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cart_id', sa.Integer(), nullable=False),
+    sa.Column('shopify_product_id', sa.String(), nullable=False),
+    sa.Column('shopify_variant_id', sa.String(), nullable=False),
+    sa.Column('product_title', sa.String(), nullable=True),
+    sa.Column('variant_title', sa.String(), nullable=True),
+    sa.Column('sku', sa.String(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.Column('line_total', sa.Float(), nullable=True),
+    sa.Column('image_url', sa.String(), nullable=True),
+    sa.Column('properties', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['cart_id'], ['cart_sessions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_cart_items_id', 'cart_items', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_cart_items_id', table_name='cart_items')
+    op.drop_table('cart_items')
+    op.drop_index('ix_cart_sessions_session_id', table_name='cart_sessions')
+    op.drop_index('ix_cart_sessions_id', table_name='cart_sessions')
+    op.drop_table('cart_sessions')
+    op.drop_index('ix_webhook_events_id', table_name='webhook_events')
+    op.drop_index('ix_webhook_events_event_id', table_name='webhook_events')
+    op.drop_table('webhook_events')
+    op.drop_index('ix_users_shopify_customer_id', table_name='users')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
+    op.drop_index('ix_social_media_links_id', table_name='social_media_links')
+    op.drop_table('social_media_links')
+    op.drop_index('ix_contact_inquiries_id', table_name='contact_inquiries')
+    op.drop_table('contact_inquiries')
+    op.drop_index('ix_business_info_id', table_name='business_info')
+    op.drop_table('business_info')
+    sa.Enum(name='inquirytype').drop(op.get_bind(), checkfirst=True)
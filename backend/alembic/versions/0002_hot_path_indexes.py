@@ -0,0 +1,32 @@
+"""hot path indexes
+
+Cart lines are looked up by cart and variant on every add-to-cart, the admin
+dashboard counts webhooks from the last week, and the inquiry list filters
+by resolution status newest first.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:05:00
+
+"""
+from alembic import op
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_cart_items_cart_id_variant_id', 'cart_items', ['cart_id', 'shopify_variant_id'], unique=False)
+    op.create_index('ix_webhook_events_created_at', 'webhook_events', ['created_at'], unique=False)
+    op.create_index('ix_contact_inquiries_created_at', 'contact_inquiries', ['created_at'], unique=False)
+    op.create_index('ix_contact_inquiries_is_resolved_created_at', 'contact_inquiries', ['is_resolved', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_contact_inquiries_is_resolved_created_at', table_name='contact_inquiries')
+    op.drop_index('ix_contact_inquiries_created_at', table_name='contact_inquiries')
+    op.drop_index('ix_webhook_events_created_at', table_name='webhook_events')
+    op.drop_index('ix_cart_items_cart_id_variant_id', table_name='cart_items')
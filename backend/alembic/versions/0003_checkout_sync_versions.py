@@ -0,0 +1,26 @@
+"""checkout sync versions
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('cart_sessions', sa.Column('checkout_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('cart_sessions', sa.Column('checkout_synced_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('cart_sessions') as batch_op:
+        batch_op.drop_column('checkout_synced_version')
+        batch_op.drop_column('checkout_version')
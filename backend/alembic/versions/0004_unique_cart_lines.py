@@ -0,0 +1,52 @@
+"""unique cart lines
+
+One line per variant per cart, so add-to-cart can upsert. Duplicate lines
+left by concurrent adds are merged into the oldest one first.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 09:15:00
+
+"""
+from alembic import op
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        UPDATE cart_items
+        SET quantity = (
+                SELECT SUM(d.quantity) FROM cart_items d
+                WHERE d.cart_id = cart_items.cart_id
+                AND d.shopify_variant_id = cart_items.shopify_variant_id
+            ),
+            line_total = price * (
+                SELECT SUM(d.quantity) FROM cart_items d
+                WHERE d.cart_id = cart_items.cart_id
+                AND d.shopify_variant_id = cart_items.shopify_variant_id
+            )
+        WHERE id IN (
+            SELECT MIN(id) FROM cart_items
+            GROUP BY cart_id, shopify_variant_id
+            HAVING COUNT(*) > 1
+        )
+    """)
+    op.execute("""
+        DELETE FROM cart_items
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM cart_items
+            GROUP BY cart_id, shopify_variant_id
+        )
+    """)
+    op.drop_index('ix_cart_items_cart_id_variant_id', table_name='cart_items')
+    op.create_index('ix_cart_items_cart_id_variant_id', 'cart_items', ['cart_id', 'shopify_variant_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_cart_items_cart_id_variant_id', table_name='cart_items')
+    op.create_index('ix_cart_items_cart_id_variant_id', 'cart_items', ['cart_id', 'shopify_variant_id'], unique=False)
@@ -0,0 +1,22 @@
+"""cart expiry index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 13:20:00
+
+"""
+from alembic import op
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_cart_sessions_is_active_expires_at', 'cart_sessions', ['is_active', 'expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_cart_sessions_is_active_expires_at', table_name='cart_sessions')
@@ -0,0 +1,124 @@
+"""catalog tables
+
+The catalog mirror and per-day product sales. A database that create_all()
+built after those models existed already has them, so each table is
+only created when missing.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    
+    if not inspector.has_table('products'):
+        op.create_table('products',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('handle', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('body_html', sa.Text(), nullable=True),
+        sa.Column('vendor', sa.String(), nullable=True),
+        sa.Column('product_type', sa.String(), nullable=True),
+        sa.Column('tags', sa.String(), nullable=True),
+        sa.Column('flavor', sa.String(), nullable=True),
+        sa.Column('is_award_winning', sa.Boolean(), nullable=True),
+        sa.Column('is_bestseller', sa.Boolean(), nullable=True),
+        sa.Column('options', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('published_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('projection', sa.JSON(), nullable=True),
+        sa.Column('synced_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_products_flavor', 'products', ['flavor'], unique=False)
+        op.create_index('ix_products_handle', 'products', ['handle'], unique=True)
+
+    if not inspector.has_table('product_collections'):
+        op.create_table('product_collections',
+        sa.Column('product_id', sa.String(), nullable=False),
+        sa.Column('collection_id', sa.String(), nullable=False),
+        sa.Column('collection_handle', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('product_id', 'collection_id')
+        )
+        op.create_index('ix_product_collections_collection_handle', 'product_collections', ['collection_handle'], unique=False)
+        op.create_index('ix_product_collections_collection_id', 'product_collections', ['collection_id'], unique=False)
+
+    if not inspector.has_table('product_images'):
+        op.create_table('product_images',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('product_id', sa.String(), nullable=False),
+        sa.Column('src', sa.String(), nullable=False),
+        sa.Column('alt', sa.String(), nullable=True),
+        sa.Column('position', sa.Integer(), nullable=True),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_product_images_product_id', 'product_images', ['product_id'], unique=False)
+
+    if not inspector.has_table('variants'):
+        op.create_table('variants',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('product_id', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('price', sa.Float(), nullable=True),
+        sa.Column('compare_at_price', sa.Float(), nullable=True),
+        sa.Column('sku', sa.String(), nullable=True),
+        sa.Column('position', sa.Integer(), nullable=True),
+        sa.Column('barcode', sa.String(), nullable=True),
+        sa.Column('inventory_policy', sa.String(), nullable=True),
+        sa.Column('inventory_quantity', sa.Integer(), nullable=True),
+        sa.Column('available', sa.Boolean(), nullable=True),
+        sa.Column('taxable', sa.Boolean(), nullable=True),
+        sa.Column('requires_shipping', sa.Boolean(), nullable=True),
+        sa.Column('grams', sa.Integer(), nullable=True),
+        sa.Column('weight', sa.Float(), nullable=True),
+        sa.Column('weight_unit', sa.String(), nullable=True),
+        sa.Column('option1', sa.String(), nullable=True),
+        sa.Column('option2', sa.String(), nullable=True),
+        sa.Column('option3', sa.String(), nullable=True),
+        sa.Column('image_id', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_variants_product_id', 'variants', ['product_id'], unique=False)
+        op.create_index('ix_variants_sku', 'variants', ['sku'], unique=False)
+
+    if not inspector.has_table('product_sales'):
+        op.create_table('product_sales',
+        sa.Column('product_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('product_id', 'day')
+        )
+        op.create_index('ix_product_sales_day', 'product_sales', ['day'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_product_sales_day', table_name='product_sales')
+    op.drop_table('product_sales')
+    op.drop_index('ix_variants_sku', table_name='variants')
+    op.drop_index('ix_variants_product_id', table_name='variants')
+    op.drop_table('variants')
+    op.drop_index('ix_product_images_product_id', table_name='product_images')
+    op.drop_table('product_images')
+    op.drop_index('ix_product_collections_collection_id', table_name='product_collections')
+    op.drop_index('ix_product_collections_collection_handle', table_name='product_collections')
+    op.drop_table('product_collections')
+    op.drop_index('ix_products_handle', table_name='products')
+    op.drop_index('ix_products_flavor', table_name='products')
+    op.drop_table('products')
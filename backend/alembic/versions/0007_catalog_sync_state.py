@@ -0,0 +1,31 @@
+"""catalog sync state
+
+Records the last completed full catalog sync. Catalog reads only switch to
+the mirror once this row exists.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-20 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('catalog_sync_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('products', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('catalog_sync_state')
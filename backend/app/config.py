@@ -10,7 +10,25 @@ class Settings(BaseSettings):
     
     DATABASE_URL: str
     REDIS_URL: Optional[str] = None
-    
+    MIGRATE_ON_STARTUP: bool = True  # Upgrade to the latest Alembic revision when a worker boots
+
+    # Catalog cache (in-process LRU, backed by Redis when REDIS_URL is set)
+    CATALOG_CACHE_TTL_SECONDS: int = 300
+    CATALOG_CACHE_LOCAL_TTL_SECONDS: int = 30
+    CATALOG_CACHE_MAX_ENTRIES: int = 512
+    CATALOG_CACHE_STALE_TTL_SECONDS: int = 86400  # Last good copy served while Shopify is down
+    CART_CACHE_TTL_SECONDS: int = 3600  # Rendered GET /cart bodies, per cart_session_id
+
+    # Cart changes reach the Shopify checkout once a cart has been idle this
+    # long, and never later than the max delay after the first change
+    CHECKOUT_SYNC_DEBOUNCE_SECONDS: float = 0.5
+    CHECKOUT_SYNC_MAX_DELAY_SECONDS: float = 2.0
+
+    # Expired and inactive carts are deleted this often (0 disables), in
+    # batches of this many carts
+    CART_REAPER_INTERVAL_SECONDS: float = 3600
+    CART_REAPER_BATCH_SIZE: int = 500
+
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -26,6 +44,45 @@ class Settings(BaseSettings):
     SHOPIFY_API_VERSION: str = "2024-01"
     SHOPIFY_WEBHOOK_SECRET: Optional[str] = None
     
+    # Shopify REST rate limiting (leaky bucket, see X-Shopify-Shop-Api-Call-Limit)
+    SHOPIFY_API_BUCKET_SIZE: int = 40
+    SHOPIFY_API_LEAK_RATE: float = 2.0
+    SHOPIFY_API_BACKGROUND_RESERVE: int = 10
+    SHOPIFY_RATE_LIMIT_RETRIES: int = 3
+    
+    # Shopify HTTP transport
+    SHOPIFY_HTTP2: bool = True
+    SHOPIFY_MAX_CONNECTIONS: int = 20
+    SHOPIFY_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    SHOPIFY_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    SHOPIFY_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    SHOPIFY_READ_TIMEOUT_SECONDS: float = 10.0
+    SHOPIFY_WRITE_TIMEOUT_SECONDS: float = 10.0
+    SHOPIFY_POOL_TIMEOUT_SECONDS: float = 5.0
+    SHOPIFY_RETRIES: int = 2  # Transient failures of idempotent requests
+    SHOPIFY_RETRY_BACKOFF_SECONDS: float = 0.25
+    SHOPIFY_RETRY_MAX_BACKOFF_SECONDS: float = 4.0
+    SHOPIFY_HEDGE_AFTER_SECONDS: Optional[float] = None  # Unset disables hedged reads
+    SHOPIFY_PREWARM_CONNECTIONS: int = 2
+    
+    # Circuit breaker: open after this many consecutive failed or slow calls
+    SHOPIFY_BREAKER_FAILURE_THRESHOLD: int = 5
+    SHOPIFY_BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    SHOPIFY_BREAKER_RESET_SECONDS: float = 30.0
+    
+    # Catalog sync (GraphQL bulk export). Point SHOPIFY_BULK_LOCAL_FILE at a
+    # JSONL export to sync from disk instead of Shopify.
+    CATALOG_SYNC_POLL_INTERVAL_SECONDS: float = 2.0
+    CATALOG_SYNC_TIMEOUT_SECONDS: int = 1800  # Whole sync: export, download and ingest
+    SHOPIFY_BULK_LOCAL_FILE: Optional[str] = None
+    
+    # Rebuild in-memory catalog indexes from the mirror at least this often
+    CATALOG_INDEX_REFRESH_SECONDS: int = 30
+    
+    # Featured products rank recent order volume over this many days
+    FEATURED_PRODUCTS_COUNT: int = 6
+    FEATURED_SALES_WINDOW_DAYS: int = 30
+    
     # Stripe Configuration (for additional payment processing)
     STRIPE_SECRET_KEY: Optional[str] = None
     STRIPE_WEBHOOK_SECRET: Optional[str] = None
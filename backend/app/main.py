@@ -4,7 +4,8 @@ from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import logging
 from .config import settings
-from .database import engine, Base
+from .database import engine, SessionLocal
+from .migrations import ensure_schema
 from .routers import (
     auth_router,
     users_router,
@@ -17,6 +18,14 @@ from .routers import (
     admin_router
 )
 from .services.shopify_client import shopify_client
+from .services.cache import catalog_cache
+from .services.cart_cache import cart_cache
+from .services.cart_reaper import cart_reaper
+from .services.checkout_sync import checkout_sync
+from .services.catalog import catalog_store
+from .services.shopify_client import CircuitOpenError
+from .utils.http_cache import StaleResponseMiddleware
+from .utils.serialization import FastJSONResponse
 
 # Configure logging
 logging.basicConfig(
@@ -31,21 +40,37 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up Chyler's Hawaiian Beef Chips API...")
     
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
+    # Apply pending migrations (a single version check when already current)
+    if settings.MIGRATE_ON_STARTUP:
+        ensure_schema(engine)
+    
+    # Serve the catalog from the local mirror if it has been synced
+    with SessionLocal() as db:
+        catalog_store.refresh_loaded(db)
+    
+    # Open Shopify connections before the first storefront request
+    await shopify_client.warm_up(settings.SHOPIFY_PREWARM_CONNECTIONS)
+    
+    # Delete expired carts in the background
+    cart_reaper.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    await cart_reaper.close()
+    await checkout_sync.close()
     await shopify_client.close()
+    await catalog_cache.close()
+    await cart_cache.close()
 
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
     description="API for Chyler's Hawaiian Beef Chips - Premium Hawaiian Snacks",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS
@@ -56,6 +81,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(StaleResponseMiddleware)
 
 
 # Exception handlers
@@ -67,6 +93,15 @@ async def not_found_handler(request: Request, exc):
     )
 
 
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Shopify is temporarily unavailable"},
+        headers={"Retry-After": str(int(exc.retry_after) + 1)}
+    )
+
+
 @app.exception_handler(500)
 async def internal_error_handler(request: Request, exc):
     logger.error(f"Internal server error: {exc}")
@@ -0,0 +1,85 @@
+from pathlib import Path
+from typing import Set
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+ALEMBIC_INI = BACKEND_DIR / "alembic.ini"
+SCRIPT_LOCATION = BACKEND_DIR / "alembic"
+
+# Revision that matches the schema the app used to build with create_all()
+BASELINE_REVISION = "0001"
+
+# Serializes upgrades across workers booting at once (Postgres only)
+MIGRATION_LOCK_KEY = 0x6368796C  # "chyl"
+
+_REVISION = re.compile(r"^revision\s*=\s*['\"](\w+)['\"]", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision\s*=\s*(.+)$", re.MULTILINE)
+
+
+def head_revisions() -> Set[str]:
+    """Heads of the migration graph, read from the version files.
+    
+    Parsed directly so the startup check doesn't pay for importing Alembic.
+    """
+    revisions, parents = set(), set()
+    for path in (SCRIPT_LOCATION / "versions").glob("*.py"):
+        source = path.read_text()
+        revision = _REVISION.search(source)
+        if not revision:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION.search(source)
+        if down_revision:
+            parents.update(re.findall(r"['\"](\w+)['\"]", down_revision.group(1)))
+    return revisions - parents
+
+
+def current_revisions(connection: Connection) -> Set[str]:
+    """Revisions recorded in the database, empty if it was never migrated"""
+    if not inspect(connection).has_table("alembic_version"):
+        return set()
+    return {row[0] for row in connection.execute(text("SELECT version_num FROM alembic_version"))}
+
+
+def upgrade_schema(connection: Connection):
+    from alembic import command
+    from alembic.config import Config
+    
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(SCRIPT_LOCATION))
+    config.attributes["connection"] = connection
+    
+    if not current_revisions(connection) and inspect(connection).has_table("users"):
+        # Tables created by create_all() before migrations existed
+        logger.info(f"Adopting existing schema at revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+def ensure_schema(engine: Engine) -> bool:
+    """Upgrade the database to the latest migration if it isn't already.
+    
+    When the recorded revision is current, which is every worker start
+    except the first after a deploy, this only reads the recorded version. Returns
+    whether an upgrade ran.
+    """
+    heads = head_revisions()
+    with engine.connect() as connection:
+        if current_revisions(connection) == heads:
+            return False
+    
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        # Another worker may have finished the upgrade while we waited
+        if current_revisions(connection) == heads:
+            return False
+        upgrade_schema(connection)
+    
+    logger.info(f"Database schema upgraded to {', '.join(sorted(heads))}")
+    return True
@@ -3,6 +3,7 @@ from .contact import ContactInquiry
 from .business import BusinessInfo, SocialMediaLink
 from .cart import CartSession, CartItem
 from .webhook import WebhookEvent
+from .product import Product, Variant, ProductImage, ProductSales, CatalogSyncState
 
 __all__ = [
     "User",
@@ -11,5 +12,10 @@ __all__ = [
     "SocialMediaLink",
     "CartSession",
     "CartItem",
-    "WebhookEvent"
+    "WebhookEvent",
+    "Product",
+    "Variant",
+    "ProductImage",
+    "ProductSales",
+    "CatalogSyncState"
 ]
\ No newline at end of file
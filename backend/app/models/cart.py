@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -7,6 +7,9 @@ import uuid
 
 class CartSession(Base):
     __tablename__ = "cart_sessions"
+    __table_args__ = (
+        Index("ix_cart_sessions_is_active_expires_at", "is_active", "expires_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String, unique=True, default=lambda: str(uuid.uuid4()), index=True)
@@ -14,6 +17,8 @@ class CartSession(Base):
     shopify_checkout_id = Column(String, nullable=True)
     shopify_checkout_token = Column(String, nullable=True)
     checkout_url = Column(String, nullable=True)
+    checkout_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every line change
+    checkout_synced_version = Column(Integer, nullable=False, default=0, server_default="0")  # Last version sent to Shopify
     total_amount = Column(Float, default=0.0)
     subtotal = Column(Float, default=0.0)
     tax_amount = Column(Float, default=0.0)
@@ -31,6 +36,9 @@ class CartSession(Base):
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    __table_args__ = (
+        Index("ix_cart_items_cart_id_variant_id", "cart_id", "shopify_variant_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     cart_id = Column(Integer, ForeignKey("cart_sessions.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Index
 from sqlalchemy.sql import func
 from ..database import Base
 import enum
@@ -15,6 +15,10 @@ class InquiryType(str, enum.Enum):
 
 class ContactInquiry(Base):
     __tablename__ = "contact_inquiries"
+    __table_args__ = (
+        Index("ix_contact_inquiries_created_at", "created_at"),
+        Index("ix_contact_inquiries_is_resolved_created_at", "is_resolved", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -0,0 +1,107 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, JSON, Boolean, Text, Table
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+
+# Collection membership (collections themselves stay in Shopify)
+product_collections = Table(
+    "product_collections",
+    Base.metadata,
+    Column("product_id", String, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+    Column("collection_id", String, primary_key=True, index=True),
+    Column("collection_handle", String, index=True)
+)
+
+
+class Product(Base):
+    __tablename__ = "products"
+    
+    id = Column(String, primary_key=True)  # Shopify product ID
+    handle = Column(String, unique=True, index=True, nullable=False)
+    title = Column(String, nullable=False)
+    body_html = Column(Text)
+    vendor = Column(String)
+    product_type = Column(String)
+    tags = Column(String, default="")  # Comma-separated, as Shopify sends them
+    flavor = Column(String, index=True)
+    is_award_winning = Column(Boolean, default=False)
+    is_bestseller = Column(Boolean, default=False)
+    options = Column(JSON, default=list)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    published_at = Column(DateTime(timezone=True))
+    projection = Column(JSON)  # Serialized ShopifyProduct served to the storefront
+    synced_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    variants = relationship(
+        "Variant",
+        back_populates="product",
+        cascade="all, delete-orphan",
+        order_by="Variant.position"
+    )
+    images = relationship(
+        "ProductImage",
+        back_populates="product",
+        cascade="all, delete-orphan",
+        order_by="ProductImage.position"
+    )
+
+
+class Variant(Base):
+    __tablename__ = "variants"
+    
+    id = Column(String, primary_key=True)  # Shopify variant ID
+    product_id = Column(String, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
+    title = Column(String)
+    price = Column(Float)
+    compare_at_price = Column(Float)
+    sku = Column(String, index=True)
+    position = Column(Integer, default=1)
+    barcode = Column(String)
+    inventory_policy = Column(String, default="deny")
+    inventory_quantity = Column(Integer)
+    available = Column(Boolean, default=True)
+    taxable = Column(Boolean, default=True)
+    requires_shipping = Column(Boolean, default=True)
+    grams = Column(Integer)
+    weight = Column(Float)
+    weight_unit = Column(String, default="oz")
+    option1 = Column(String)  # Pack size
+    option2 = Column(String)
+    option3 = Column(String)
+    image_id = Column(String)
+    
+    product = relationship("Product", back_populates="variants")
+
+
+class ProductImage(Base):
+    __tablename__ = "product_images"
+    
+    id = Column(String, primary_key=True)  # Shopify image ID
+    product_id = Column(String, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
+    src = Column(String, nullable=False)
+    alt = Column(String)
+    position = Column(Integer, default=1)
+    width = Column(Integer)
+    height = Column(Integer)
+    
+    product = relationship("Product", back_populates="images")
+
+
+# Units sold per product per day, counted from order webhooks
+class ProductSales(Base):
+    __tablename__ = "product_sales"
+    
+    product_id = Column(String, primary_key=True)  # No FK: orders outlive products
+    day = Column(Date, primary_key=True, index=True)
+    quantity = Column(Integer, nullable=False, default=0)
+
+
+class CatalogSyncState(Base):
+    """The last completed full catalog sync; a single row with id 1"""
+    __tablename__ = "catalog_sync_state"
+    
+    id = Column(Integer, primary_key=True)
+    completed_at = Column(DateTime(timezone=True), nullable=False)
+    products = Column(Integer, nullable=False, default=0)
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Boolean, Index
 from sqlalchemy.sql import func
 from ..database import Base
 
 
 class WebhookEvent(Base):
     __tablename__ = "webhook_events"
+    __table_args__ = (
+        Index("ix_webhook_events_created_at", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     source = Column(String, nullable=False)  # 'shopify', 'stripe', etc.
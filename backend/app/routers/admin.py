@@ -2,10 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
+from contextlib import aclosing
 from ..database import get_db
 from ..models import User, ContactInquiry, WebhookEvent
 from ..utils.auth import get_current_admin_user
-from ..services.shopify_client import shopify_client
+from ..services.shopify_client import shopify_client, RequestPriority
+from ..services.catalog_sync import catalog_sync
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,19 +38,23 @@ async def get_admin_stats(
     # Get Shopify stats
     try:
         # Get order count from Shopify
-        orders_response = await shopify_client.http_client.get(
-            "/orders/count.json",
-            params={"status": "any"}
+        total_orders = await shopify_client.get_count(
+            "orders",
+            params={"status": "any"},
+            priority=RequestPriority.BACKGROUND
         )
-        total_orders = orders_response.json()["count"]
         
         # Get customer count
-        customers_response = await shopify_client.http_client.get("/customers/count.json")
-        total_customers = customers_response.json()["count"]
+        total_customers = await shopify_client.get_count(
+            "customers",
+            priority=RequestPriority.BACKGROUND
+        )
         
         # Get product count
-        products_response = await shopify_client.http_client.get("/products/count.json")
-        total_products = products_response.json()["count"]
+        total_products = await shopify_client.get_count(
+            "products",
+            priority=RequestPriority.BACKGROUND
+        )
         
     except Exception as e:
         logger.error(f"Error fetching Shopify stats: {e}")
@@ -119,24 +125,36 @@ async def get_all_orders(
 ):
     """Get all orders from Shopify (admin only)"""
     try:
-        orders = await shopify_client.get_orders(status=status)
+        orders = []
+        pages = shopify_client.iter_orders(status=status, page_size=min(limit, 250))
+        async with aclosing(pages):
+            async for page in pages:
+                orders.extend(page)
+                if len(orders) >= limit:
+                    break
         return {"orders": orders[:limit]}
     except Exception as e:
         logger.error(f"Error fetching orders: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch orders")
 
 
-@router.post("/sync-products")
+@router.post("/sync-products", status_code=202)
 async def sync_products(
     current_admin = Depends(get_current_admin_user)
 ):
-    """Manually sync products from Shopify (admin only)"""
-    try:
-        products = await shopify_client.get_products(limit=250)
-        return {
-            "message": "Products synced successfully",
-            "count": len(products)
-        }
-    except Exception as e:
-        logger.error(f"Error syncing products: {e}")
-        raise HTTPException(status_code=500, detail="Failed to sync products")
\ No newline at end of file
+    """Start a full catalog sync from Shopify (admin only)"""
+    if not catalog_sync.start():
+        raise HTTPException(status_code=409, detail="Product sync already running")
+    
+    return {
+        "message": "Product sync started",
+        "sync": catalog_sync.status()
+    }
+
+
+@router.get("/sync-products/status")
+async def get_sync_status(
+    current_admin = Depends(get_current_admin_user)
+):
+    """Get progress and timing of the latest catalog sync (admin only)"""
+    return catalog_sync.status()
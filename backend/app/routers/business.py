@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
@@ -7,6 +7,7 @@ from ..database import get_db
 from ..models.business import BusinessInfo, SocialMediaLink
 from ..schemas.business import BusinessInfoResponse, SocialMediaLink as SocialMediaLinkSchema
 from ..utils.auth import get_current_admin_user
+from ..utils.http_cache import conditional, latest, make_etag
 from ..config import settings
 
 router = APIRouter(prefix="/api/v1/business", tags=["business"])
@@ -35,7 +36,11 @@ def is_business_open() -> tuple[bool, str]:
 
 
 @router.get("/info", response_model=BusinessInfoResponse)
-async def get_business_info(db: Session = Depends(get_db)):
+async def get_business_info(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+):
     """Get business information"""
     # Get or create business info
     business_info = db.query(BusinessInfo).first()
@@ -53,12 +58,28 @@ async def get_business_info(db: Session = Depends(get_db)):
     # Check if open
     is_open, next_open = is_business_open()
     
-    response = BusinessInfoResponse.from_orm(business_info)
-    response.social_media_links = social_links
-    response.is_open_now = is_open
-    response.next_open_time = next_open if not is_open else None
+    # Opening status is part of the body, so it is part of the validator too
+    not_modified = conditional(
+        request,
+        response,
+        make_etag(
+            business_info.id,
+            business_info.updated_at,
+            is_open,
+            next_open,
+            *(f"{link.id}:{link.updated_at or link.created_at}" for link in social_links)
+        ),
+        latest([business_info.updated_at] + [link.updated_at or link.created_at for link in social_links])
+    )
+    if not_modified:
+        return not_modified
+    
+    info = BusinessInfoResponse.from_orm(business_info)
+    info.social_media_links = social_links
+    info.is_open_now = is_open
+    info.next_open_time = next_open if not is_open else None
     
-    return response
+    return info
 
 
 @router.get("/social-media", response_model=List[SocialMediaLinkSchema])
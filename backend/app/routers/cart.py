@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Numeric, cast, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, Optional
 from datetime import datetime, timedelta
 import uuid
 from ..database import get_db
@@ -8,39 +11,59 @@ from ..models.cart import CartSession, CartItem
 from ..models.user import User
 from ..schemas.cart import (
     Cart, CartCreate, AddToCartRequest, 
-    UpdateCartItemRequest, ApplyDiscountRequest,
-    ShippingRateRequest
+    UpdateCartItemRequest, UpdateCartItemsRequest,
+    ApplyDiscountRequest, ShippingRateRequest
 )
-from ..services.shopify_client import shopify_client
+from ..services.cart_cache import cart_cache
+from ..services.checkout_sync import checkout_sync
+from ..services.shopify_client import CircuitOpenError, shopify_client
+from ..services.variants import resolve_variant
 from ..utils.auth import get_current_active_user
+from ..utils.serialization import FastJSONResponse
 from ..config import settings
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/cart", tags=["cart"])
 
 
+def get_cart_session(
+    request: Request,
+    db: Session,
+    user: Optional[User] = None
+) -> Optional[CartSession]:
+    """Get the cart session named by the cookie, with its items, if it exists"""
+    session_id = request.cookies.get("cart_session_id")
+    if not session_id:
+        return None
+    
+    cart = db.query(CartSession).options(selectinload(CartSession.items)).filter(
+        CartSession.session_id == session_id,
+        CartSession.is_active == True
+    ).first()
+    
+    # Update user if logged in
+    if cart and user and not cart.user_id:
+        cart.user_id = user.id
+        db.commit()
+    return cart
+
+
 def get_or_create_cart_session(
     request: Request,
     response: Response,
     db: Session,
     user: Optional[User] = None
 ) -> CartSession:
-    """Get existing cart session or create new one"""
-    session_id = request.cookies.get("cart_session_id")
+    """Get existing cart session, or start one for the change being made.
     
-    if session_id:
-        cart = db.query(CartSession).filter(
-            CartSession.session_id == session_id,
-            CartSession.is_active == True
-        ).first()
-        
-        if cart:
-            # Update user if logged in
-            if user and not cart.user_id:
-                cart.user_id = user.id
-                db.commit()
-            return cart
+    A new cart is only flushed, so it is saved by the change's own commit
+    and never left behind empty when the change fails.
+    """
+    cart = get_cart_session(request, db, user)
+    if cart:
+        return cart
     
     # Create new cart session
     new_session_id = str(uuid.uuid4())
@@ -51,8 +74,7 @@ def get_or_create_cart_session(
         is_active=True
     )
     db.add(cart)
-    db.commit()
-    db.refresh(cart)
+    db.flush()
     
     # Set cookie
     response.set_cookie(
@@ -66,33 +88,173 @@ def get_or_create_cart_session(
     return cart
 
 
-@router.get("/", response_model=Cart)
-async def get_cart(
-    request: Request,
-    response: Response,
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_active_user)
-) -> Cart:
-    """Get current cart"""
-    cart = get_or_create_cart_session(request, response, db, current_user)
+def empty_cart() -> Cart:
+    """The cart shown to a visitor who hasn't added anything yet"""
+    return Cart(
+        total_amount=0,
+        subtotal=0,
+        tax_amount=0,
+        shipping_amount=0,
+        discount_amount=0,
+        is_active=True
+    )
+
+
+def lock_cart_lines(db: Session, cart: CartSession):
+    """Claim the cart for a line change and bump its checkout version.
+    
+    The update holds the cart row until commit, so concurrent changes to
+    the same cart (double clicks, parallel tabs) apply one after another
+    and each one's totals see the lines the others committed. Call it after
+    any awaits, right before writing lines.
+    """
+    db.execute(
+        update(CartSession)
+        .where(CartSession.id == cart.id)
+        .values(checkout_version=CartSession.checkout_version + 1)
+    )
+
+
+def update_totals(db: Session, cart: CartSession):
+    """Recompute the stored totals from the cart's lines"""
+    db.flush()
+    subtotal = func.round(
+        cast(
+            select(func.coalesce(func.sum(CartItem.line_total), 0))
+            .where(CartItem.cart_id == cart.id)
+            .scalar_subquery(),
+            Numeric
+        ),
+        2
+    )
+    db.execute(
+        update(CartSession)
+        .where(CartSession.id == cart.id)
+        .values(
+            subtotal=subtotal,
+            total_amount=subtotal + CartSession.tax_amount + CartSession.shipping_amount - CartSession.discount_amount
+        )
+    )
+
+
+def find_line(cart: CartSession, variant_id: str) -> Optional[CartItem]:
+    return next((item for item in cart.items if item.shopify_variant_id == str(variant_id)), None)
+
+
+def set_line_quantity(cart: CartSession, item: CartItem, quantity: int):
+    """Change a line's quantity, removing the line at zero"""
+    if quantity <= 0:
+        cart.items.remove(item)
+    else:
+        item.quantity = quantity
+        item.line_total = item.price * quantity
+
+
+def upsert_line(
+    db: Session,
+    cart: CartSession,
+    variant: Dict,
+    quantity: int,
+    properties: Optional[Dict] = None,
+    increment: bool = True
+):
+    """Insert a variant's line, or add to (or replace) the quantity of the existing one.
     
-    # Calculate totals
-    subtotal = sum(item.line_total for item in cart.items)
-    cart.subtotal = subtotal
-    cart.total_amount = subtotal + cart.tax_amount + cart.shipping_amount - cart.discount_amount
+    A single INSERT ... ON CONFLICT against the unique (cart_id, variant)
+    index, so two requests adding the same variant can neither create
+    duplicate lines nor lose an increment.
+    """
+    # Pending removals must reach the table before the conflict check
+    db.flush()
     
-    # Check free shipping eligibility
-    is_free_shipping = subtotal >= settings.FREE_SHIPPING_THRESHOLD
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    price = float(variant["price"])
+    stmt = insert(CartItem).values(
+        cart_id=cart.id,
+        shopify_product_id=variant["product_id"],
+        shopify_variant_id=variant["variant_id"],
+        product_title=variant["product_title"],
+        variant_title=variant["variant_title"],
+        sku=variant["sku"],
+        quantity=quantity,
+        price=price,
+        line_total=price * quantity,
+        image_url=variant["image_url"],
+        properties=properties or {}
+    )
+    new_quantity = CartItem.quantity + stmt.excluded.quantity if increment else stmt.excluded.quantity
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[CartItem.cart_id, CartItem.shopify_variant_id],
+        set_={
+            "quantity": new_quantity,
+            "line_total": CartItem.price * new_quantity,
+            "updated_at": func.now()
+        }
+    ))
     
-    db.commit()
+    # The loaded lines no longer match the table
+    db.expire(cart, ["items"])
+
+
+async def wait_for_checkout(cart: CartSession, db: Session):
+    """Let a pending checkout sync finish so the checkout matches the cart"""
+    if cart.checkout_synced_version < cart.checkout_version:
+        try:
+            await checkout_sync.wait(cart.id)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error(f"Error syncing checkout for cart {cart.id}: {e}")
+            raise HTTPException(status_code=502, detail="Failed to update Shopify checkout")
+        db.refresh(cart)
+
+
+async def render_cart(cart: CartSession, replace: bool = True) -> Cart:
+    """Build the cart response and store it in the cart cache.
     
+    Reads pass ``replace=False`` so they only fill a missing entry and never
+    overwrite what a concurrent change stored.
+    """
     cart_response = Cart.from_orm(cart)
     cart_response.items_count = sum(item.quantity for item in cart.items)
-    cart_response.is_free_shipping_eligible = is_free_shipping
+    cart_response.is_free_shipping_eligible = cart.subtotal >= settings.FREE_SHIPPING_THRESHOLD
     
+    body = FastJSONResponse(jsonable_encoder(cart_response)).body
+    if replace:
+        await cart_cache.set(cart.session_id, body)
+    else:
+        await cart_cache.fill(cart.session_id, body)
     return cart_response
 
 
+async def refresh_cart(cart: CartSession, db: Session) -> Cart:
+    """Re-read a cart after a committed change and replace its cached copy"""
+    db.refresh(cart)
+    return await render_cart(cart)
+
+
+@router.get("/", response_model=Cart)
+async def get_cart(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_active_user)
+) -> Cart:
+    """Get current cart, from the cart cache when possible"""
+    session_id = request.cookies.get("cart_session_id")
+    if session_id:
+        body = await cart_cache.get(session_id)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
+    
+    # Totals are kept up to date by the mutations, so reading never writes.
+    # Carts are only created by the first add.
+    cart = get_cart_session(request, db)
+    if cart is None:
+        return empty_cart()
+    return await render_cart(cart, replace=False)
+
+
 @router.post("/items", response_model=Cart)
 async def add_to_cart(
     item_data: AddToCartRequest,
@@ -101,82 +263,113 @@ async def add_to_cart(
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_active_user)
 ) -> Cart:
-    """Add item to cart"""
-    cart = get_or_create_cart_session(request, response, db, current_user)
-    
+    """Add item to cart, creating the cart on the first add"""
     try:
-        # Get variant details from Shopify
-        variant_response = await shopify_client.http_client.get(
-            f"/variants/{item_data.variant_id}.json"
-        )
-        variant = variant_response.json()["variant"]
+        # Get variant and product details from the catalog mirror
+        variant = await resolve_variant(db, item_data.variant_id)
+        if not variant:
+            raise HTTPException(status_code=404, detail="Variant not found")
+        if not variant["available"]:
+            raise HTTPException(status_code=400, detail="Variant is sold out")
         
-        # Get product details
-        product_response = await shopify_client.http_client.get(
-            f"/products/{variant['product_id']}.json"
-        )
-        product = product_response.json()["product"]
+        # Shopify checkout is created or updated in the background
+        cart = get_or_create_cart_session(request, response, db, current_user)
+        lock_cart_lines(db, cart)
+        upsert_line(db, cart, variant, item_data.quantity, item_data.properties)
+        update_totals(db, cart)
+        db.commit()
         
-        # Check if item already in cart
-        existing_item = db.query(CartItem).filter(
-            CartItem.cart_id == cart.id,
-            CartItem.shopify_variant_id == str(item_data.variant_id)
-        ).first()
+        cart_response = await refresh_cart(cart, db)
+        checkout_sync.schedule(cart.id)
+        return cart_response
         
-        if existing_item:
-            # Update quantity
-            existing_item.quantity += item_data.quantity
-            existing_item.line_total = existing_item.price * existing_item.quantity
-        else:
-            # Add new item
-            cart_item = CartItem(
-                cart_id=cart.id,
-                shopify_product_id=str(variant["product_id"]),
-                shopify_variant_id=str(variant["id"]),
-                product_title=product["title"],
-                variant_title=variant["title"],
-                sku=variant.get("sku"),
-                quantity=item_data.quantity,
-                price=float(variant["price"]),
-                line_total=float(variant["price"]) * item_data.quantity,
-                image_url=product["images"][0]["src"] if product.get("images") else None,
-                properties=item_data.properties or {}
-            )
-            db.add(cart_item)
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logger.error(f"Error adding to cart: {e}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to add item to cart")
+
+
+@router.patch("/items", response_model=Cart)
+async def update_cart_items(
+    update_data: UpdateCartItemsRequest,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_active_user)
+) -> Cart:
+    """Apply add, set and remove operations by variant as one cart change.
+    
+    Operations run in order in a single transaction and end in a single
+    checkout sync. If any operation fails, none are applied.
+    """
+    try:
+        variant_ids = list({
+            operation.variant_id for operation in update_data.operations
+            if operation.op != "remove" and operation.quantity > 0
+        })
+        resolved = await asyncio.gather(*(resolve_variant(db, variant_id) for variant_id in variant_ids))
+        variants = dict(zip(variant_ids, resolved))
         
-        # Create or update Shopify checkout if needed
-        if not cart.shopify_checkout_id:
-            checkout_data = await shopify_client.create_checkout([{
-                "variant_id": item_data.variant_id,
-                "quantity": item_data.quantity,
-                "properties": item_data.properties
-            }])
-            cart.shopify_checkout_id = checkout_data["id"]
-            cart.shopify_checkout_token = checkout_data["token"]
-            cart.checkout_url = checkout_data["web_url"]
+        # Only a batch that leaves something in the cart may create one
+        if variant_ids:
+            cart = get_or_create_cart_session(request, response, db, current_user)
         else:
-            # Update existing checkout
-            line_items = []
-            for cart_item in cart.items:
-                line_items.append({
-                    "variant_id": cart_item.shopify_variant_id,
-                    "quantity": cart_item.quantity,
-                    "properties": cart_item.properties
-                })
+            cart = get_cart_session(request, db, current_user)
+            if cart is None:
+                return empty_cart()
+        
+        # One checkout sync for the whole batch
+        lock_cart_lines(db, cart)
+        for operation in update_data.operations:
+            if operation.op == "add":
+                if operation.quantity <= 0:
+                    continue
+                variant = variants[operation.variant_id]
+                if not variant:
+                    raise HTTPException(status_code=404, detail=f"Variant {operation.variant_id} not found")
+                if not variant["available"]:
+                    raise HTTPException(status_code=400, detail=f"Variant {operation.variant_id} is sold out")
+                upsert_line(db, cart, variant, operation.quantity, operation.properties)
+                continue
+            
+            item = find_line(cart, operation.variant_id)
+            if operation.op == "remove" or operation.quantity <= 0:
+                if item:
+                    set_line_quantity(cart, item, 0)
+                continue
+            
+            variant = variants[operation.variant_id]
+            if not variant:
+                raise HTTPException(status_code=404, detail=f"Variant {operation.variant_id} not found")
+            if (item is None or operation.quantity > item.quantity) and not variant["available"]:
+                raise HTTPException(status_code=400, detail=f"Variant {operation.variant_id} is sold out")
             
-            checkout_data = await shopify_client.update_checkout(
-                cart.shopify_checkout_token,
-                {"line_items": line_items}
-            )
+            if item:
+                set_line_quantity(cart, item, operation.quantity)
+            else:
+                upsert_line(db, cart, variant, operation.quantity, operation.properties, increment=False)
         
+        update_totals(db, cart)
         db.commit()
         
-        return await get_cart(request, response, db, current_user)
+        cart_response = await refresh_cart(cart, db)
+        checkout_sync.schedule(cart.id)
+        return cart_response
         
+    except HTTPException:
+        db.rollback()
+        raise
+    except CircuitOpenError:
+        db.rollback()
+        raise
     except Exception as e:
-        logger.error(f"Error adding to cart: {e}")
+        logger.error(f"Error updating cart items: {e}")
         db.rollback()
-        raise HTTPException(status_code=500, detail="Failed to add item to cart")
+        raise HTTPException(status_code=500, detail="Failed to update cart")
 
 
 @router.put("/items/{item_id}", response_model=Cart)
@@ -189,46 +382,22 @@ async def update_cart_item(
     current_user: Optional[User] = Depends(get_current_active_user)
 ) -> Cart:
     """Update cart item quantity"""
-    cart = get_or_create_cart_session(request, response, db, current_user)
+    cart = get_cart_session(request, db, current_user)
     
-    cart_item = db.query(CartItem).filter(
-        CartItem.id == item_id,
-        CartItem.cart_id == cart.id
-    ).first()
+    cart_item = next((item for item in cart.items if item.id == item_id), None) if cart else None
     
     if not cart_item:
         raise HTTPException(status_code=404, detail="Cart item not found")
     
-    if update_data.quantity <= 0:
-        # Remove item
-        db.delete(cart_item)
-    else:
-        # Update quantity
-        cart_item.quantity = update_data.quantity
-        cart_item.line_total = cart_item.price * cart_item.quantity
-    
-    # Update Shopify checkout
-    if cart.shopify_checkout_id:
-        line_items = []
-        for item in cart.items:
-            if item.id != item_id or update_data.quantity > 0:
-                line_items.append({
-                    "variant_id": item.shopify_variant_id,
-                    "quantity": item.quantity if item.id != item_id else update_data.quantity,
-                    "properties": item.properties
-                })
-        
-        try:
-            await shopify_client.update_checkout(
-                cart.shopify_checkout_token,
-                {"line_items": line_items}
-            )
-        except Exception as e:
-            logger.error(f"Error updating Shopify checkout: {e}")
-    
+    # Shopify checkout is updated in the background
+    lock_cart_lines(db, cart)
+    set_line_quantity(cart, cart_item, update_data.quantity)  # Removes the item at zero
+    update_totals(db, cart)
     db.commit()
     
-    return await get_cart(request, response, db, current_user)
+    cart_response = await refresh_cart(cart, db)
+    checkout_sync.schedule(cart.id)
+    return cart_response
 
 
 @router.delete("/items/{item_id}", response_model=Cart)
@@ -258,7 +427,9 @@ async def clear_cart(
     current_user: Optional[User] = Depends(get_current_active_user)
 ):
     """Clear all items from cart"""
-    cart = get_or_create_cart_session(request, response, db, current_user)
+    cart = get_cart_session(request, db, current_user)
+    if cart is None:
+        return
     
     # Delete all items
     db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
@@ -274,7 +445,12 @@ async def clear_cart(
     cart.discount_amount = 0
     cart.discount_codes = []
     
+    # Nothing left to sync, and a sync already in flight must not restore the checkout
+    cart.checkout_version = CartSession.checkout_version + 1
+    cart.checkout_synced_version = CartSession.checkout_version + 1
+    
     db.commit()
+    await cart_cache.invalidate(cart.session_id)
 
 
 @router.post("/discount", response_model=Cart)
@@ -286,7 +462,10 @@ async def apply_discount_code(
     current_user: Optional[User] = Depends(get_current_active_user)
 ) -> Cart:
     """Apply discount code to cart"""
-    cart = get_or_create_cart_session(request, response, db, current_user)
+    cart = get_cart_session(request, db, current_user)
+    if cart is None:
+        raise HTTPException(status_code=400, detail="Cart is empty")
+    await wait_for_checkout(cart, db)
     
     if not cart.shopify_checkout_id:
         raise HTTPException(status_code=400, detail="Cart is empty")
@@ -301,10 +480,11 @@ async def apply_discount_code(
         # Update cart with discount info
         cart.discount_codes = [discount_data.discount_code]
         cart.discount_amount = float(checkout_data.get("total_discounts", "0"))
+        update_totals(db, cart)
         
         db.commit()
         
-        return await get_cart(request, response, db, current_user)
+        return await refresh_cart(cart, db)
         
     except Exception as e:
         logger.error(f"Error applying discount: {e}")
@@ -320,7 +500,10 @@ async def calculate_shipping_rates(
     current_user: Optional[User] = Depends(get_current_active_user)
 ):
     """Calculate shipping rates for address"""
-    cart = get_or_create_cart_session(request, response, db, current_user)
+    cart = get_cart_session(request, db, current_user)
+    if cart is None:
+        raise HTTPException(status_code=400, detail="Cart is empty")
+    await wait_for_checkout(cart, db)
     
     if not cart.shopify_checkout_id:
         raise HTTPException(status_code=400, detail="Cart is empty")
@@ -375,8 +558,11 @@ async def get_checkout_url(
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_active_user)
 ):
-    """Get Shopify checkout URL"""
-    cart = get_or_create_cart_session(request, response, db, current_user)
+    """Get Shopify checkout URL, once pending cart changes have reached it"""
+    cart = get_cart_session(request, db, current_user)
+    if cart is None:
+        raise HTTPException(status_code=400, detail="Cart is empty")
+    await wait_for_checkout(cart, db)
     
     if not cart.checkout_url:
         raise HTTPException(status_code=400, detail="Cart is empty")
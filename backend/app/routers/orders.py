@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Optional
 from ..utils.auth import get_current_active_user
 from ..models.user import User
-from ..services.shopify_client import shopify_client
+from ..services.shopify_client import CircuitOpenError, shopify_client
 from ..schemas.shopify import ShopifyOrder
 import logging
 
@@ -47,6 +47,8 @@ async def get_orders(
         
         return result
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching orders: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch orders")
@@ -83,6 +85,8 @@ async def get_order(
         
     except HTTPException:
         raise
+    except CircuitOpenError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching order: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch order")
\ No newline at end of file
@@ -1,168 +1,223 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional
-from ..services.shopify_client import shopify_client
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from ..config import settings
+from ..database import get_db
+from ..services.shopify_client import CircuitOpenError, shopify_client
+from ..services.cache import catalog_cache
+from ..services.collections import get_all_collections, resolve_collection_id
+from ..services.catalog import catalog_store, project_product
+from ..services.facets import FacetIndex, facet_index
+from ..services.featured import featured_index
+from ..services.search import SearchIndex, search_index
 from ..schemas.shopify import ShopifyProduct, ShopifyCollection
+from ..utils.http_cache import conditional, latest, make_etag
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/products", tags=["products"])
 
 
-@router.get("/", response_model=List[ShopifyProduct])
-async def get_products(
-    limit: int = Query(50, ge=1, le=250),
-    collection_handle: Optional[str] = None,
-    flavor: Optional[str] = None,
-    pack_size: Optional[str] = None
-) -> List[ShopifyProduct]:
-    """Get all products with optional filtering"""
+async def _fetch_projections(limit: int, collection_id: Optional[str]) -> List[Dict]:
+    products = await shopify_client.get_products(limit=limit, collection_id=collection_id)
+    return [project_product(product) for product in products]
+
+
+async def _fetch_projection_by_handle(handle: str) -> Optional[Dict]:
+    product = await shopify_client.get_product_by_handle(handle)
+    return project_product(product) if product else None
+
+
+async def _fallback_entries() -> List[Dict]:
+    """Index entries for the first page of Shopify products"""
+    products = await catalog_cache.get_or_load(
+        "products:projection:list:250:all",
+        lambda: _fetch_projections(250, None)
+    )
+    return [{"projection": p, "collections": []} for p in products]
+
+
+async def _search_index(db: Session) -> SearchIndex:
+    if catalog_store.is_loaded(db):
+        search_index.ensure_fresh(db)
+        return search_index
+    
+    # Index the first page from Shopify until the mirror is synced
+    index = SearchIndex(catalog_store)
+    index.rebuild(await _fallback_entries())
+    return index
+
+
+def _catalog_validators(products: List[Dict]):
+    """ETag and Last-Modified for a list of product projections"""
+    return (
+        make_etag(*(f"{p['id']}:{p['updated_at']}" for p in products)),
+        latest(p["updated_at"] for p in products)
+    )
+
+
+async def _list_products(
+    limit: int,
+    collection_handle: Optional[str],
+    flavor: Optional[str],
+    pack_size: Optional[str],
+    db: Session
+) -> List[Dict]:
     try:
+        # Filter in the local facet index once the mirror is synced
+        if catalog_store.is_loaded(db):
+            facet_index.ensure_fresh(db)
+            return facet_index.search(
+                {"flavor": flavor, "pack_size": pack_size, "collection": collection_handle},
+                limit=limit
+            )
+        
         # Get collection ID if handle provided
         collection_id = None
         if collection_handle:
-            collections = await shopify_client.http_client.get(
-                f"/collections.json?handle={collection_handle}"
-            )
-            collections_data = collections.json()
-            if collections_data["collections"]:
-                collection_id = collections_data["collections"][0]["id"]
+            collection_id = await resolve_collection_id(collection_handle)
         
-        # Get products
-        products = await shopify_client.get_products(
-            limit=limit,
-            collection_id=collection_id
+        products = await catalog_cache.get_or_load(
+            f"products:projection:list:{limit}:{collection_id or 'all'}",
+            lambda: _fetch_projections(limit, collection_id)
         )
         
-        # Transform and filter products
-        result = []
-        for product in products:
-            # Parse custom attributes from tags or metafields
-            flavor_tag = None
-            pack_sizes = []
-            is_award_winning = False
-            is_bestseller = False
-            
-            for tag in product.get("tags", "").split(","):
-                tag = tag.strip().lower()
-                if tag in ["original", "cracked pepper", "spicy", "roasted garlic"]:
-                    flavor_tag = tag.title()
-                elif tag == "award-winning":
-                    is_award_winning = True
-                elif tag == "bestseller":
-                    is_bestseller = True
-                elif "pack" in tag:
-                    pack_sizes.append(tag)
-            
-            # Extract pack sizes from variants
-            if not pack_sizes:
-                pack_sizes = list(set([
-                    v.get("option1", "") 
-                    for v in product.get("variants", [])
-                    if v.get("option1")
-                ]))
-            
-            # Apply filters
-            if flavor and flavor_tag != flavor:
-                continue
-            if pack_size and pack_size not in pack_sizes:
-                continue
-            
-            # Extract nutrition info from description or metafields
-            nutrition_info = {
-                "protein": "18g",
-                "carbs": "3g",
-                "fat": "5g",
-                "calories": "120",
-                "serving_size": "1.5 oz",
-                "keto_friendly": True,
-                "gluten_free": True
-            }
-            
-            shopify_product = ShopifyProduct(
-                id=str(product["id"]),
-                title=product["title"],
-                handle=product["handle"],
-                body_html=product.get("body_html"),
-                vendor=product.get("vendor", "Chyler's Hawaiian Beef Chips"),
-                product_type=product.get("product_type", "Beef Chips"),
-                created_at=product["created_at"],
-                updated_at=product["updated_at"],
-                published_at=product.get("published_at"),
-                tags=product.get("tags", "").split(","),
-                variants=[
-                    {
-                        "id": str(v["id"]),
-                        "product_id": str(v["product_id"]),
-                        "title": v["title"],
-                        "price": v["price"],
-                        "sku": v.get("sku"),
-                        "position": v.get("position", 1),
-                        "inventory_policy": v.get("inventory_policy", "deny"),
-                        "compare_at_price": v.get("compare_at_price"),
-                        "option1": v.get("option1"),
-                        "option2": v.get("option2"),
-                        "option3": v.get("option3"),
-                        "barcode": v.get("barcode"),
-                        "grams": v.get("grams"),
-                        "weight": v.get("weight"),
-                        "weight_unit": v.get("weight_unit", "oz"),
-                        "inventory_quantity": v.get("inventory_quantity"),
-                        "available": v.get("available", True),
-                        "image_id": str(v["image_id"]) if v.get("image_id") else None,
-                        "requires_shipping": v.get("requires_shipping", True),
-                        "taxable": v.get("taxable", True)
-                    }
-                    for v in product.get("variants", [])
-                ],
-                images=[
-                    {
-                        "id": str(img["id"]),
-                        "src": img["src"],
-                        "alt": img.get("alt"),
-                        "position": img.get("position", 1),
-                        "width": img.get("width"),
-                        "height": img.get("height")
-                    }
-                    for img in product.get("images", [])
-                ],
-                options=product.get("options", []),
-                flavor=flavor_tag,
-                pack_sizes=pack_sizes,
-                nutrition_info=nutrition_info,
-                is_award_winning=is_award_winning,
-                is_bestseller=is_bestseller
-            )
-            
-            result.append(shopify_product)
-        
-        return result
+        # Apply filters
+        return [
+            product for product in products
+            if (not flavor or product["flavor"] == flavor)
+            and (not pack_size or pack_size in product["pack_sizes"])
+        ]
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching products: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch products")
 
 
+@router.get("/", response_model=List[ShopifyProduct])
+async def get_products(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=250),
+    collection_handle: Optional[str] = None,
+    flavor: Optional[str] = None,
+    pack_size: Optional[str] = None,
+    db: Session = Depends(get_db)
+) -> List[ShopifyProduct]:
+    """Get all products with optional filtering"""
+    products = await _list_products(limit, collection_handle, flavor, pack_size, db)
+    
+    not_modified = conditional(request, response, *_catalog_validators(products))
+    if not_modified:
+        return not_modified
+    return products
+
+
 @router.get("/featured", response_model=List[ShopifyProduct])
-async def get_featured_products() -> List[ShopifyProduct]:
+async def get_featured_products(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+) -> List[ShopifyProduct]:
     """Get featured products (bestsellers and award-winning)"""
-    all_products = await get_products(limit=100)
-    featured = [
-        p for p in all_products 
-        if p.is_bestseller or p.is_award_winning
-    ]
-    return featured[:6]  # Return top 6 featured products
+    if catalog_store.is_loaded(db):
+        featured_index.ensure_fresh(db)
+        featured = featured_index.top()
+    else:
+        all_products = await _list_products(100, None, None, None, db)
+        featured = [
+            p for p in all_products 
+            if p["is_bestseller"] or p["is_award_winning"]
+        ][:settings.FEATURED_PRODUCTS_COUNT]
+    
+    not_modified = conditional(request, response, *_catalog_validators(featured))
+    if not_modified:
+        return not_modified
+    return featured
+
+
+@router.get("/facets")
+async def get_product_facets(
+    collection_handle: Optional[str] = None,
+    flavor: Optional[str] = None,
+    pack_size: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get product counts per flavor, pack size, collection, tag and availability"""
+    try:
+        if catalog_store.is_loaded(db):
+            facet_index.ensure_fresh(db)
+            index = facet_index
+        else:
+            # Index the first page from Shopify until the mirror is synced
+            index = FacetIndex(catalog_store)
+            index.rebuild(await _fallback_entries())
+        
+        filters = {"flavor": flavor, "pack_size": pack_size, "collection": collection_handle}
+        return {
+            "total": len(index.search(filters)),
+            "facets": index.facet_counts(filters)
+        }
+        
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching product facets: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch product facets")
+
+
+@router.get("/search", response_model=List[ShopifyProduct])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+) -> List[ShopifyProduct]:
+    """Search products by title, description, tags and SKU"""
+    try:
+        index = await _search_index(db)
+        return index.search(q, limit=limit)
+        
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching products: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search products")
+
+
+@router.get("/autocomplete")
+async def autocomplete_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(8, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """Suggest query completions and products for a partial query"""
+    try:
+        index = await _search_index(db)
+        return index.suggest(q, limit=limit)
+        
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logger.error(f"Error autocompleting products: {e}")
+        raise HTTPException(status_code=500, detail="Failed to autocomplete products")
 
 
 @router.get("/collections", response_model=List[ShopifyCollection])
-async def get_collections() -> List[ShopifyCollection]:
+async def get_collections(request: Request, response: Response) -> List[ShopifyCollection]:
     """Get all product collections"""
     try:
-        response = await shopify_client.http_client.get("/custom_collections.json")
-        collections = response.json()["custom_collections"]
+        collections = await get_all_collections()
         
-        # Also get smart collections
-        smart_response = await shopify_client.http_client.get("/smart_collections.json")
-        collections.extend(smart_response.json()["smart_collections"])
+        not_modified = conditional(
+            request,
+            response,
+            make_etag(*(f"{c['id']}:{c.get('updated_at')}" for c in collections)),
+            latest(c.get("updated_at") for c in collections)
+        )
+        if not_modified:
+            return not_modified
         
         return [
             ShopifyCollection(
@@ -182,108 +237,41 @@ async def get_collections() -> List[ShopifyCollection]:
             for c in collections
         ]
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching collections: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch collections")
 
 
 @router.get("/{product_handle}", response_model=ShopifyProduct)
-async def get_product_by_handle(product_handle: str) -> ShopifyProduct:
+async def get_product_by_handle(
+    product_handle: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+) -> ShopifyProduct:
     """Get single product by handle"""
     try:
-        product = await shopify_client.get_product_by_handle(product_handle)
+        if catalog_store.is_loaded(db):
+            product = catalog_store.get_projection_by_handle(db, product_handle)
+        else:
+            product = await catalog_cache.get_or_load(
+                f"products:projection:handle:{product_handle}",
+                lambda: _fetch_projection_by_handle(product_handle)
+            )
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
         
-        # Transform product (same logic as above)
-        flavor_tag = None
-        pack_sizes = []
-        is_award_winning = False
-        is_bestseller = False
-        
-        for tag in product.get("tags", "").split(","):
-            tag = tag.strip().lower()
-            if tag in ["original", "cracked pepper", "spicy", "roasted garlic"]:
-                flavor_tag = tag.title()
-            elif tag == "award-winning":
-                is_award_winning = True
-            elif tag == "bestseller":
-                is_bestseller = True
-        
-        # Extract pack sizes from variants
-        pack_sizes = list(set([
-            v.get("option1", "") 
-            for v in product.get("variants", [])
-            if v.get("option1")
-        ]))
-        
-        nutrition_info = {
-            "protein": "18g",
-            "carbs": "3g",
-            "fat": "5g",
-            "calories": "120",
-            "serving_size": "1.5 oz",
-            "keto_friendly": True,
-            "gluten_free": True
-        }
-        
-        return ShopifyProduct(
-            id=str(product["id"]),
-            title=product["title"],
-            handle=product["handle"],
-            body_html=product.get("body_html"),
-            vendor=product.get("vendor", "Chyler's Hawaiian Beef Chips"),
-            product_type=product.get("product_type", "Beef Chips"),
-            created_at=product["created_at"],
-            updated_at=product["updated_at"],
-            published_at=product.get("published_at"),
-            tags=product.get("tags", "").split(","),
-            variants=[
-                {
-                    "id": str(v["id"]),
-                    "product_id": str(v["product_id"]),
-                    "title": v["title"],
-                    "price": v["price"],
-                    "sku": v.get("sku"),
-                    "position": v.get("position", 1),
-                    "inventory_policy": v.get("inventory_policy", "deny"),
-                    "compare_at_price": v.get("compare_at_price"),
-                    "option1": v.get("option1"),
-                    "option2": v.get("option2"),
-                    "option3": v.get("option3"),
-                    "barcode": v.get("barcode"),
-                    "grams": v.get("grams"),
-                    "weight": v.get("weight"),
-                    "weight_unit": v.get("weight_unit", "oz"),
-                    "inventory_quantity": v.get("inventory_quantity"),
-                    "available": v.get("available", True),
-                    "image_id": str(v["image_id"]) if v.get("image_id") else None,
-                    "requires_shipping": v.get("requires_shipping", True),
-                    "taxable": v.get("taxable", True)
-                }
-                for v in product.get("variants", [])
-            ],
-            images=[
-                {
-                    "id": str(img["id"]),
-                    "src": img["src"],
-                    "alt": img.get("alt"),
-                    "position": img.get("position", 1),
-                    "width": img.get("width"),
-                    "height": img.get("height")
-                }
-                for img in product.get("images", [])
-            ],
-            options=product.get("options", []),
-            flavor=flavor_tag,
-            pack_sizes=pack_sizes,
-            nutrition_info=nutrition_info,
-            is_award_winning=is_award_winning,
-            is_bestseller=is_bestseller
-        )
+        not_modified = conditional(request, response, *_catalog_validators([product]))
+        if not_modified:
+            return not_modified
+        return product
         
     except HTTPException:
         raise
+    except CircuitOpenError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching product: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch product")
\ No newline at end of file
@@ -50,9 +50,9 @@ async def update_current_user(
             if user_update.phone is not None:
                 shopify_updates["phone"] = user_update.phone
             
-            await shopify_client.http_client.put(
-                f"/customers/{current_user.shopify_customer_id}.json",
-                json={"customer": shopify_updates}
+            await shopify_client.update_customer(
+                current_user.shopify_customer_id,
+                shopify_updates
             )
         except Exception as e:
             logger.error(f"Failed to update Shopify customer: {e}")
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Request, Response, Depends, HTTPException
 from sqlalchemy.orm import Session
-import json
 from ..database import get_db
 from ..models.webhook import WebhookEvent
 from ..services.shopify_client import shopify_client
 from ..services.email import send_order_confirmation_email
+from ..services.cache import catalog_cache
+from ..services.catalog import catalog_store, project_product
+from ..services.collections import invalidate_collections
+from ..services.featured import featured_index, record_order_sales
+from ..utils.serialization import loads
 from ..config import settings
 import logging
 
@@ -26,7 +30,7 @@ async def handle_order_created(
         raise HTTPException(status_code=401, detail="Invalid webhook signature")
     
     try:
-        order_data = json.loads(body)
+        order_data = loads(body)
         
         # Store webhook event
         webhook_event = WebhookEvent(
@@ -38,26 +42,34 @@ async def handle_order_created(
         )
         db.add(webhook_event)
         
-        # Send order confirmation email
-        if order_data.get("email"):
-            await send_order_confirmation_email(
-                order_data["email"],
-                {
-                    "order_number": order_data["name"],
-                    "total_price": order_data["total_price"],
-                    "line_items": order_data.get("line_items", [])
-                }
-            )
+        sales = record_order_sales(db, order_data)
         
         webhook_event.processed = True
         db.commit()
         
-        return {"status": "success"}
-        
     except Exception as e:
         logger.error(f"Error processing order webhook: {e}")
         db.rollback()
         raise HTTPException(status_code=500, detail="Failed to process webhook")
+    
+    featured_index.record_sales(sales)
+    
+    # Send order confirmation email once the order is recorded, so a
+    # webhook that fails and is retried doesn't email the customer twice
+    if order_data.get("email"):
+        try:
+            await send_order_confirmation_email(
+                order_data["email"],
+                {
+                    "order_number": order_data["name"],
+                    "total_price": order_data["total_price"],
+                    "line_items": order_data.get("line_items", [])
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error sending confirmation for order {order_data['id']}: {e}")
+    
+    return {"status": "success"}
 
 
 @router.post("/shopify/customers/create")
@@ -73,7 +85,7 @@ async def handle_customer_created(
         raise HTTPException(status_code=401, detail="Invalid webhook signature")
     
     try:
-        customer_data = json.loads(body)
+        customer_data = loads(body)
         
         # Store webhook event
         webhook_event = WebhookEvent(
@@ -95,6 +107,166 @@ async def handle_customer_created(
         raise HTTPException(status_code=500, detail="Failed to process webhook")
 
 
+async def _handle_product_event(
+    request: Request,
+    db: Session,
+    event_type: str
+):
+    """Record a product webhook and refresh the catalog cache"""
+    body = await request.body()
+    hmac_header = request.headers.get("X-Shopify-Hmac-Sha256", "")
+    
+    if not await shopify_client.verify_webhook(body, hmac_header):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    
+    try:
+        product_data = loads(body)
+        
+        # Store webhook event (Shopify sends many updates per product)
+        webhook_id = request.headers.get("X-Shopify-Webhook-Id")
+        webhook_event = WebhookEvent(
+            source="shopify",
+            event_type=event_type,
+            event_id=webhook_id or f"{event_type}_{product_data['id']}_{product_data.get('updated_at')}",
+            payload=product_data,
+            headers=dict(request.headers)
+        )
+        db.add(webhook_event)
+        
+        # Any list may contain the product and its handle may have changed,
+        # so drop every catalog entry and re-seed the single-product entry
+        await catalog_cache.invalidate_prefix("products:")
+        projection = None
+        if event_type == "product.deleted":
+            catalog_store.delete(db, product_data["id"])
+        elif catalog_store.is_outdated(db, product_data):
+            # Webhooks can arrive late or out of order
+            logger.info(f"Skipping outdated webhook for product {product_data['id']}")
+        elif product_data.get("handle"):
+            catalog_store.upsert(db, product_data)
+            projection = project_product(product_data)
+            await catalog_cache.set(
+                f"products:projection:handle:{product_data['handle']}",
+                projection
+            )
+        
+        webhook_event.processed = True
+        db.commit()
+        
+        # Update in-memory indexes only once the mirror has committed
+        if projection:
+            catalog_store.notify_product_changed(projection)
+        elif event_type == "product.deleted":
+            catalog_store.notify_product_deleted(product_data["id"])
+        
+        return {"status": "success"}
+        
+    except Exception as e:
+        logger.error(f"Error processing product webhook: {e}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to process webhook")
+
+
+@router.post("/shopify/products/create")
+async def handle_product_created(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Handle Shopify product created webhook"""
+    return await _handle_product_event(request, db, "product.created")
+
+
+@router.post("/shopify/products/update")
+async def handle_product_updated(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Handle Shopify product updated webhook"""
+    return await _handle_product_event(request, db, "product.updated")
+
+
+@router.post("/shopify/products/delete")
+async def handle_product_deleted(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Handle Shopify product deleted webhook"""
+    return await _handle_product_event(request, db, "product.deleted")
+
+
+async def _handle_collection_event(
+    request: Request,
+    db: Session,
+    event_type: str
+):
+    """Record a collection webhook and refresh cached collections"""
+    body = await request.body()
+    hmac_header = request.headers.get("X-Shopify-Hmac-Sha256", "")
+    
+    if not await shopify_client.verify_webhook(body, hmac_header):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    
+    try:
+        collection_data = loads(body)
+        
+        webhook_id = request.headers.get("X-Shopify-Webhook-Id")
+        webhook_event = WebhookEvent(
+            source="shopify",
+            event_type=event_type,
+            event_id=webhook_id or f"{event_type}_{collection_data['id']}_{collection_data.get('updated_at')}",
+            payload=collection_data,
+            headers=dict(request.headers)
+        )
+        db.add(webhook_event)
+        
+        # Handles and membership feed both the handle map and product lists
+        await invalidate_collections()
+        await catalog_cache.invalidate_prefix("products:")
+        if event_type == "collection.deleted":
+            catalog_store.remove_collection(db, collection_data["id"])
+        elif collection_data.get("handle"):
+            catalog_store.rename_collection(db, collection_data["id"], collection_data["handle"])
+        
+        webhook_event.processed = True
+        db.commit()
+        
+        catalog_store.notify_catalog_reloaded()
+        
+        return {"status": "success"}
+        
+    except Exception as e:
+        logger.error(f"Error processing collection webhook: {e}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to process webhook")
+
+
+@router.post("/shopify/collections/create")
+async def handle_collection_created(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Handle Shopify collection created webhook"""
+    return await _handle_collection_event(request, db, "collection.created")
+
+
+@router.post("/shopify/collections/update")
+async def handle_collection_updated(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Handle Shopify collection updated webhook"""
+    return await _handle_collection_event(request, db, "collection.updated")
+
+
+@router.post("/shopify/collections/delete")
+async def handle_collection_deleted(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Handle Shopify collection deleted webhook"""
+    return await _handle_collection_event(request, db, "collection.deleted")
+
+
 @router.post("/shopify/carts/update")
 async def handle_cart_update(
     request: Request,
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 from decimal import Decimal
 
@@ -44,8 +44,9 @@ class CartUpdate(BaseModel):
 
 
 class Cart(CartBase):
-    id: int
-    session_id: str
+    # Unset until the first item is added
+    id: Optional[int] = None
+    session_id: Optional[str] = None
     user_id: Optional[int] = None
     shopify_checkout_id: Optional[str] = None
     shopify_checkout_token: Optional[str] = None
@@ -57,7 +58,7 @@ class Cart(CartBase):
     discount_amount: Decimal
     is_active: bool
     expires_at: Optional[datetime] = None
-    created_at: datetime
+    created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     items: List[CartItem] = []
     
@@ -79,6 +80,17 @@ class UpdateCartItemRequest(BaseModel):
     quantity: int
 
 
+class CartItemOperation(BaseModel):
+    op: Literal["add", "set", "remove"]
+    variant_id: str
+    quantity: int = Field(1, ge=0)  # Units to add, or the new quantity for "set"
+    properties: Optional[Dict[str, Any]] = None
+
+
+class UpdateCartItemsRequest(BaseModel):
+    operations: List[CartItemOperation] = Field(..., min_length=1, max_length=50)
+
+
 class ApplyDiscountRequest(BaseModel):
     discount_code: str
 
@@ -0,0 +1,224 @@
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from ..config import settings
+from ..utils.serialization import dumps, loads
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Per-request flag holder, installed by StaleResponseMiddleware
+stale_marker: ContextVar[Optional[Dict[str, bool]]] = ContextVar("stale_marker", default=None)
+
+
+def mark_stale():
+    """Flag the current request as having been served stale data"""
+    marker = stale_marker.get()
+    if marker is not None:
+        marker["stale"] = True
+
+
+class LRUCache:
+    """In-process LRU cache with per-entry expiry"""
+    
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: Any, ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+    
+    def delete_prefix(self, prefix: str):
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+    
+    def clear(self):
+        self._entries.clear()
+
+
+class CatalogCache:
+    """Two-tier cache for Shopify catalog data.
+    
+    Reads hit the in-process LRU first, then Redis (shared between workers)
+    when ``REDIS_URL`` is configured, and finally the supplied loader. The
+    local tier uses a shorter TTL so workers converge quickly after another
+    worker invalidates an entry from a webhook.
+    
+    Every loaded value is also kept as a "last good" copy for
+    ``stale_ttl``. When the loader fails (Shopify down or the circuit
+    breaker open) that copy is served instead, the request is marked
+    stale, and a background refresh runs once the loader is expected to
+    work again.
+    """
+    
+    namespace = "chylers:catalog:"
+    stale_prefix = "stale:"
+    revalidate_delay = 5.0
+    
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        ttl: int = 300,
+        local_ttl: int = 30,
+        max_entries: int = 512,
+        stale_ttl: int = 86400
+    ):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.local_ttl = min(local_ttl, ttl)
+        self.stale_ttl = stale_ttl
+        self.local = LRUCache(max_entries)
+        self._redis = None
+        self._revalidating: Dict[str, asyncio.Task] = {}
+
+    @property
+    def redis(self):
+        if self._redis is None and self.redis_url:
+            import redis.asyncio as redis
+            
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+    
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        
+        if self.redis is None:
+            return None
+        
+        try:
+            raw = await self.redis.get(self.namespace + key)
+        except Exception as e:
+            logger.warning(f"Catalog cache read failed for {key}: {e}")
+            return None
+        
+        if raw is None:
+            return None
+        
+        value = loads(raw)
+        self.local.set(key, value, self.local_ttl)
+        return value
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ttl = ttl or self.ttl
+        self.local.set(key, value, self.local_ttl if self.redis is not None else ttl)
+        
+        if self.redis is None:
+            return
+        
+        try:
+            await self.redis.set(self.namespace + key, dumps(value), ex=ttl)
+        except Exception as e:
+            logger.warning(f"Catalog cache write failed for {key}: {e}")
+    
+    async def _store(self, key: str, value: Any):
+        await self.set(key, value)
+        await self.set(self.stale_prefix + key, value, self.stale_ttl)
+    
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return cached value for key, calling loader on a miss.
+        
+        ``None`` results are not cached so newly published products show up
+        without waiting for the TTL. If the loader raises, the last good
+        value is returned when there is one.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+        
+        try:
+            value = await loader()
+        except Exception as e:
+            stale = await self.get(self.stale_prefix + key)
+            if stale is None:
+                raise
+            logger.warning(f"Serving stale {key}: {e}")
+            mark_stale()
+            self._schedule_revalidation(key, loader, getattr(e, "retry_after", self.revalidate_delay))
+            return stale
+        
+        if value is not None:
+            await self._store(key, value)
+        return value
+    
+    def _schedule_revalidation(self, key: str, loader: Callable[[], Awaitable[Any]], delay: float):
+        if key in self._revalidating:
+            return
+        task = asyncio.create_task(self._revalidate(key, loader, delay))
+        self._revalidating[key] = task
+        task.add_done_callback(lambda _: self._revalidating.pop(key, None))
+    
+    async def _revalidate(self, key: str, loader: Callable[[], Awaitable[Any]], delay: float):
+        await asyncio.sleep(delay)
+        try:
+            value = await loader()
+        except Exception as e:
+            logger.warning(f"Background refresh of {key} failed: {e}")
+            return
+        if value is not None:
+            await self._store(key, value)
+    
+    async def invalidate(self, key: str):
+        self.local.delete(key)
+        
+        if self.redis is None:
+            return
+        
+        try:
+            await self.redis.delete(self.namespace + key)
+        except Exception as e:
+            logger.warning(f"Catalog cache invalidation failed for {key}: {e}")
+    
+    async def invalidate_prefix(self, prefix: str):
+        self.local.delete_prefix(prefix)
+        
+        if self.redis is None:
+            return
+        
+        try:
+            keys = [
+                key async for key in self.redis.scan_iter(match=f"{self.namespace}{prefix}*")
+            ]
+            if keys:
+                await self.redis.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Catalog cache invalidation failed for {prefix}*: {e}")
+    
+    async def close(self):
+        """Cancel background refreshes and close Redis connection"""
+        for task in list(self._revalidating.values()):
+            task.cancel()
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+catalog_cache = CatalogCache(
+    redis_url=settings.REDIS_URL,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+    local_ttl=settings.CATALOG_CACHE_LOCAL_TTL_SECONDS,
+    max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+    stale_ttl=settings.CATALOG_CACHE_STALE_TTL_SECONDS
+)
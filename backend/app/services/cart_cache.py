@@ -0,0 +1,109 @@
+from typing import List, Optional
+from ..config import settings
+from .cache import LRUCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CartCache:
+    """Rendered carts keyed by the ``cart_session_id`` cookie.
+    
+    Holds the JSON body of ``GET /api/v1/cart`` so the header badge, which
+    polls it on every page, doesn't touch the database. The database stays
+    the source of truth: cart mutations commit first and then replace the
+    cached copy. Entries live in Redis when ``REDIS_URL`` is set so every
+    worker sees the same cart, otherwise in process (tests, single-worker
+    development).
+    
+    Reads only ``fill`` a missing entry, so a read that loaded the cart
+    before a change committed can't overwrite the body the change stored.
+    ``invalidate`` leaves a short-lived tombstone for the same reason:
+    while it lasts, reads miss but can't fill.
+    """
+    
+    namespace = "chylers:cart:"
+    tombstone = b""
+    
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        ttl: int = 3600,
+        max_entries: int = 10000,
+        tombstone_ttl: int = 10
+    ):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.tombstone_ttl = tombstone_ttl
+        self.local = LRUCache(max_entries)
+        self._redis = None
+
+    @property
+    def redis(self):
+        if self._redis is None and self.redis_url:
+            import redis.asyncio as redis
+            
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+    
+    async def get(self, session_id: str) -> Optional[bytes]:
+        if self.redis is None:
+            body = self.local.get(session_id)
+        else:
+            try:
+                body = await self.redis.get(self.namespace + session_id)
+            except Exception as e:
+                logger.warning(f"Cart cache read failed for {session_id}: {e}")
+                return None
+        return body or None
+    
+    async def set(self, session_id: str, body: bytes):
+        """Store the body a cart change rendered after committing"""
+        if self.redis is None:
+            self.local.set(session_id, body, self.ttl)
+            return
+        
+        try:
+            await self.redis.set(self.namespace + session_id, body, ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Cart cache write failed for {session_id}: {e}")
+            await self.invalidate(session_id)
+    
+    async def fill(self, session_id: str, body: bytes):
+        """Store the body a read rendered, unless something is already there"""
+        if self.redis is None:
+            if self.local.get(session_id) is None:
+                self.local.set(session_id, body, self.ttl)
+            return
+        
+        try:
+            await self.redis.set(self.namespace + session_id, body, ex=self.ttl, nx=True)
+        except Exception as e:
+            logger.warning(f"Cart cache write failed for {session_id}: {e}")
+    
+    async def invalidate(self, session_id: str):
+        await self.invalidate_many([session_id])
+    
+    async def invalidate_many(self, session_ids: List[str]):
+        if not session_ids:
+            return
+        if self.redis is None:
+            for session_id in session_ids:
+                self.local.set(session_id, self.tombstone, self.tombstone_ttl)
+            return
+        
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for session_id in session_ids:
+                    pipe.set(self.namespace + session_id, self.tombstone, ex=self.tombstone_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Cart cache invalidation failed for {len(session_ids)} carts: {e}")
+    
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+cart_cache = CartCache(redis_url=settings.REDIS_URL, ttl=settings.CART_CACHE_TTL_SECONDS)
@@ -0,0 +1,147 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+from sqlalchemy import delete, or_, and_, select, text
+from ..config import settings
+from ..database import SessionLocal
+from ..models.cart import CartSession, CartItem
+from .cart_cache import cart_cache
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Keeps workers from reaping at the same time (Postgres only)
+REAPER_LOCK_KEY = 0x63617274  # "cart"
+
+
+class CartReaper:
+    """Delete expired and inactive carts, with their items, in small batches.
+    
+    Each batch selects up to ``batch_size`` carts through the
+    ``(is_active, expires_at)`` index, deletes their items and then the
+    carts, and commits, so no transaction holds many rows for long. On
+    Postgres, carts locked by an in-flight cart change are skipped until the
+    next run, and a worker that finds another one reaping leaves it to them.
+    """
+    
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_size: int = 500,
+        interval: float = 3600,
+        pause: float = 0.1
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pause = pause
+        self._task: Optional[asyncio.Task] = None
+    
+    def _reap_batch(self, now: datetime) -> Optional[Dict]:
+        """Delete one batch; None when another worker holds the reaper lock"""
+        with self.session_factory() as db:
+            if db.get_bind().dialect.name == "postgresql":
+                locked = db.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REAPER_LOCK_KEY}
+                ).scalar()
+                if not locked:
+                    return None
+            
+            rows = db.execute(
+                select(CartSession.id, CartSession.session_id)
+                .where(or_(
+                    CartSession.is_active == False,
+                    and_(CartSession.is_active == True, CartSession.expires_at < now)
+                ))
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                return {"carts": 0, "items": 0, "session_ids": []}
+            
+            cart_ids = [row.id for row in rows]
+            items = db.execute(delete(CartItem).where(CartItem.cart_id.in_(cart_ids))).rowcount
+            carts = db.execute(delete(CartSession).where(CartSession.id.in_(cart_ids))).rowcount
+            db.commit()
+        
+        return {"carts": carts, "items": items, "session_ids": [row.session_id for row in rows]}
+    
+    async def reap(self) -> Dict:
+        """Delete every cart that has expired or been deactivated"""
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        result = {"carts_removed": 0, "items_removed": 0, "batches": 0}
+        
+        while True:
+            batch = self._reap_batch(now)
+            if batch is None:
+                logger.info("Cart reaper already running on another worker")
+                break
+            if not batch["carts"]:
+                break
+            
+            result["batches"] += 1
+            result["carts_removed"] += batch["carts"]
+            result["items_removed"] += batch["items"]
+            await cart_cache.invalidate_many(batch["session_ids"])
+            if len(batch["session_ids"]) < self.batch_size:
+                break
+            # Let requests waiting on the event loop and the tables through
+            await asyncio.sleep(self.pause)
+        
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"Cart reaper removed {result['carts_removed']} carts and "
+            f"{result['items_removed']} items in {result['seconds']}s"
+        )
+        return result
+    
+    def start(self):
+        """Reap every ``interval`` seconds in the background"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+    
+    async def _run(self):
+        while True:
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"Cart reaper failed: {e}")
+            await asyncio.sleep(self.interval)
+    
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+cart_reaper = CartReaper(
+    batch_size=settings.CART_REAPER_BATCH_SIZE,
+    interval=settings.CART_REAPER_INTERVAL_SECONDS
+)
+
+
+def main(argv: Optional[List[str]] = None):
+    """python -m app.services.cart_reaper [--batch-size N]"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Delete expired and inactive carts")
+    parser.add_argument("--batch-size", type=int, default=settings.CART_REAPER_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    
+    async def run():
+        try:
+            return await CartReaper(batch_size=args.batch_size).reap()
+        finally:
+            await cart_cache.close()
+    
+    result = asyncio.run(run())
+    print(
+        f"Removed {result['carts_removed']} carts and {result['items_removed']} items "
+        f"in {result['batches']} batches, {result['seconds']}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
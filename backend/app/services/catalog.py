@@ -0,0 +1,410 @@
+from typing import Any, Dict, Iterable, List, Optional
+from collections import defaultdict
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session, selectinload
+from ..models.product import Product, Variant, ProductImage, CatalogSyncState, product_collections
+from ..schemas.shopify import ShopifyProduct
+from ..config import settings
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+FLAVORS = ["original", "cracked pepper", "spicy", "roasted garlic"]
+
+# Until nutrition facts live in metafields every chip shares the same panel
+NUTRITION_INFO = {
+    "protein": "18g",
+    "carbs": "3g",
+    "fat": "5g",
+    "calories": "120",
+    "serving_size": "1.5 oz",
+    "keto_friendly": True,
+    "gluten_free": True
+}
+
+VARIANT_FIELDS = [
+    "title", "price", "compare_at_price", "sku", "position", "barcode",
+    "inventory_policy", "inventory_quantity", "available", "taxable",
+    "requires_shipping", "grams", "weight", "weight_unit",
+    "option1", "option2", "option3"
+]
+
+IMAGE_FIELDS = ["src", "alt", "position", "width", "height"]
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _variant_available(variant: Dict) -> bool:
+    """Whether a variant can be sold.
+    
+    GraphQL exports carry ``available``; REST webhook payloads don't, so it
+    is derived from inventory the way Shopify does: untracked inventory or
+    a ``continue`` policy is always sellable, otherwise stock must remain.
+    """
+    if "available" in variant:
+        return variant["available"] is not False
+    if "inventory_management" in variant and not variant["inventory_management"]:
+        return True
+    if (variant.get("inventory_policy") or "deny") == "continue":
+        return True
+    quantity = variant.get("inventory_quantity")
+    return quantity is None or quantity > 0
+
+
+def project_product(product: Dict) -> Dict:
+    """Build the storefront projection of a Shopify product.
+    
+    Derives flavor, pack sizes, badges and nutrition info from tags and
+    variants and returns the JSON form of ``ShopifyProduct``. This runs
+    once per product when it is ingested or refreshed; request handlers
+    serve the stored result.
+    """
+    flavor = None
+    pack_sizes = []
+    is_award_winning = False
+    is_bestseller = False
+    
+    tags = product.get("tags") or ""
+    for tag in tags.split(","):
+        tag = tag.strip().lower()
+        if tag in FLAVORS:
+            flavor = tag.title()
+        elif tag == "award-winning":
+            is_award_winning = True
+        elif tag == "bestseller":
+            is_bestseller = True
+        elif "pack" in tag:
+            pack_sizes.append(tag)
+    
+    # Fall back to the pack size variant option
+    if not pack_sizes:
+        pack_sizes = list(dict.fromkeys(
+            v["option1"] for v in product.get("variants", []) if v.get("option1")
+        ))
+    
+    return ShopifyProduct(
+        id=str(product["id"]),
+        title=product["title"],
+        handle=product["handle"],
+        body_html=product.get("body_html"),
+        vendor=product.get("vendor") or "Chyler's Hawaiian Beef Chips",
+        product_type=product.get("product_type") or "Beef Chips",
+        created_at=product["created_at"],
+        updated_at=product["updated_at"],
+        published_at=product.get("published_at"),
+        tags=tags.split(","),
+        variants=[
+            {
+                "id": str(v["id"]),
+                "product_id": str(v.get("product_id", product["id"])),
+                "title": v["title"],
+                "price": v["price"],
+                "sku": v.get("sku"),
+                "position": v.get("position") or 1,
+                "inventory_policy": v.get("inventory_policy") or "deny",
+                "compare_at_price": v.get("compare_at_price"),
+                "option1": v.get("option1"),
+                "option2": v.get("option2"),
+                "option3": v.get("option3"),
+                "barcode": v.get("barcode"),
+                "grams": v.get("grams"),
+                "weight": v.get("weight"),
+                "weight_unit": v.get("weight_unit") or "oz",
+                "inventory_quantity": v.get("inventory_quantity"),
+                "available": _variant_available(v),
+                "image_id": str(v["image_id"]) if v.get("image_id") else None,
+                "requires_shipping": v.get("requires_shipping", True) is not False,
+                "taxable": v.get("taxable", True) is not False
+            }
+            for v in product.get("variants", [])
+        ],
+        images=[
+            {
+                "id": str(img["id"]),
+                "src": img["src"],
+                "alt": img.get("alt"),
+                "position": img.get("position") or 1,
+                "width": img.get("width"),
+                "height": img.get("height")
+            }
+            for img in product.get("images", [])
+        ],
+        options=product.get("options", []),
+        flavor=flavor,
+        pack_sizes=pack_sizes,
+        nutrition_info=NUTRITION_INFO,
+        is_award_winning=is_award_winning,
+        is_bestseller=is_bestseller
+    ).model_dump(mode="json")
+
+
+def _variant_values(variant: Dict) -> Dict:
+    values = {field: variant.get(field) for field in VARIANT_FIELDS}
+    for field in ("price", "compare_at_price"):
+        if values[field] is not None:
+            values[field] = float(values[field])
+    values["available"] = _variant_available(variant)
+    values["image_id"] = str(variant["image_id"]) if variant.get("image_id") else None
+    return values
+
+
+def _product_to_dict(product: Product, collections: List[Dict]) -> Dict:
+    """Rebuild the REST Admin API shape from mirror rows"""
+    return {
+        "id": product.id,
+        "title": product.title,
+        "handle": product.handle,
+        "body_html": product.body_html,
+        "vendor": product.vendor,
+        "product_type": product.product_type,
+        "tags": product.tags or "",
+        "options": product.options or [],
+        "created_at": product.created_at,
+        "updated_at": product.updated_at,
+        "published_at": product.published_at,
+        "variants": [
+            {
+                "id": v.id,
+                "product_id": v.product_id,
+                "image_id": v.image_id,
+                **{field: getattr(v, field) for field in VARIANT_FIELDS}
+            }
+            for v in product.variants
+        ],
+        "images": [
+            {"id": img.id, **{field: getattr(img, field) for field in IMAGE_FIELDS}}
+            for img in product.images
+        ],
+        "collections": collections
+    }
+
+
+class CatalogStore:
+    """Local mirror of the Shopify catalog.
+    
+    Products, variants and images are persisted in the ``products``,
+    ``variants`` and ``product_images`` tables so the storefront keeps
+    working when Shopify is slow or down. The mirror is filled by the bulk
+    catalog sync and kept current by product webhooks. Until a full sync
+    has completed ``loaded`` is False and readers should fall back to
+    Shopify; webhooks alone only ever mirror part of the catalog. Each row also stores the product's storefront projection so
+    catalog reads don't touch the variant and image tables.
+    """
+    
+    def __init__(self, recheck_interval: float = 30):
+        self.loaded = False
+        self.recheck_interval = recheck_interval
+        self._checked_at: Optional[float] = None
+        self._indexes = []
+    
+    def subscribe(self, index):
+        """Register an in-memory index to be told about catalog changes.
+        
+        Indexes implement ``add(projection)``, ``remove(product_id)`` and
+        ``invalidate()``. Notifications are sent by callers after their
+        transaction commits.
+        """
+        self._indexes.append(index)
+    
+    def notify_product_changed(self, projection: Dict):
+        for index in self._indexes:
+            index.add(projection)
+    
+    def notify_product_deleted(self, product_id: str):
+        for index in self._indexes:
+            index.remove(str(product_id))
+    
+    def notify_catalog_reloaded(self):
+        for index in self._indexes:
+            index.invalidate()
+    
+    def refresh_loaded(self, db: Session):
+        """Check whether a full sync has completed"""
+        self.loaded = db.query(CatalogSyncState.id).first() is not None
+        self._checked_at = time.monotonic()
+    
+    def record_sync(self, db: Session, products: int):
+        """Record a completed full sync.
+        
+        The caller commits, then calls ``refresh_loaded``.
+        """
+        state = db.get(CatalogSyncState, 1) or CatalogSyncState(id=1)
+        state.completed_at = datetime.now(timezone.utc)
+        state.products = products
+        db.add(state)
+    
+    def is_loaded(self, db: Session) -> bool:
+        """``loaded``, re-checked every ``recheck_interval`` seconds while False.
+        
+        A worker only sees the mirror being filled directly when it runs the
+        sync itself, so others pick it up here instead of waiting for a restart.
+        """
+        if not self.loaded and (
+            self._checked_at is None or time.monotonic() - self._checked_at > self.recheck_interval
+        ):
+            self.refresh_loaded(db)
+        return self.loaded
+    
+    def _query(self, db: Session):
+        return db.query(Product).options(
+            selectinload(Product.variants),
+            selectinload(Product.images)
+        )
+    
+    def _collections(self, db: Session, product_ids: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """Collection memberships per product (all products when product_ids is None)"""
+        result = defaultdict(list)
+        query = db.query(product_collections)
+        if product_ids is not None:
+            if not product_ids:
+                return result
+            query = query.filter(product_collections.c.product_id.in_(product_ids))
+        for product_id, collection_id, collection_handle in query.all():
+            result[product_id].append({"id": collection_id, "handle": collection_handle})
+        return result
+    
+    def _to_dicts(self, db: Session, products: List[Product]) -> List[Dict]:
+        collections = self._collections(db, [p.id for p in products])
+        return [_product_to_dict(p, collections[p.id]) for p in products]
+    
+    def count(self, db: Session) -> int:
+        return db.query(Product).count()
+    
+    def get(self, db: Session, product_id: str) -> Optional[Dict]:
+        product = self._query(db).filter(Product.id == str(product_id)).first()
+        return self._to_dicts(db, [product])[0] if product else None
+    
+    def get_projection_by_handle(self, db: Session, handle: str) -> Optional[Dict]:
+        """Storefront projection of one product"""
+        row = db.query(Product.projection).filter(Product.handle == handle).first()
+        return row.projection if row else None
+    
+    def index_entries(self, db: Session) -> List[Dict]:
+        """Every product's projection and collection handles, for building indexes"""
+        collections = self._collections(db)
+        return [
+            {
+                "projection": row.projection,
+                "collections": [c["handle"] or c["id"] for c in collections.get(row.id, [])]
+            }
+            for row in db.query(Product.id, Product.projection).all()
+        ]
+    
+    def is_outdated(self, db: Session, product: Dict) -> bool:
+        """Whether the mirror already holds a later version of ``product``.
+        
+        Compared through the stored projection, which keeps the UTC offset
+        that SQLite drops from the ``updated_at`` column.
+        """
+        incoming = _parse_timestamp(product.get("updated_at"))
+        projection = db.query(Product.projection).filter(Product.id == str(product["id"])).scalar()
+        if incoming is None or not projection or not projection.get("updated_at"):
+            return False
+        return incoming < _parse_timestamp(projection["updated_at"])
+    
+    def upsert(self, db: Session, product: Dict):
+        """Add or replace a product with its variants and images.
+        
+        The caller owns the transaction and is expected to commit.
+        """
+        product_id = str(product["id"])
+        row = db.query(Product).filter(Product.id == product_id).first()
+        if row is None:
+            row = Product(id=product_id)
+            db.add(row)
+        
+        row.handle = product["handle"]
+        row.title = product["title"]
+        row.body_html = product.get("body_html")
+        row.vendor = product.get("vendor")
+        row.product_type = product.get("product_type")
+        row.tags = product.get("tags") or ""
+        row.options = product.get("options", [])
+        row.created_at = _parse_timestamp(product.get("created_at"))
+        row.updated_at = _parse_timestamp(product.get("updated_at"))
+        row.published_at = _parse_timestamp(product.get("published_at"))
+        
+        # Derived storefront fields are computed here, once per refresh
+        row.projection = project_product(product)
+        row.flavor = row.projection["flavor"]
+        row.is_award_winning = row.projection["is_award_winning"]
+        row.is_bestseller = row.projection["is_bestseller"]
+        
+        # Update children in place so unchanged IDs keep their rows
+        variants = {v.id: v for v in row.variants}
+        row.variants = [
+            self._apply(variants.get(str(v["id"])) or Variant(id=str(v["id"])), _variant_values(v))
+            for v in product.get("variants", [])
+        ]
+        images = {img.id: img for img in row.images}
+        row.images = [
+            self._apply(
+                images.get(str(img["id"])) or ProductImage(id=str(img["id"])),
+                {field: img.get(field) for field in IMAGE_FIELDS}
+            )
+            for img in product.get("images", [])
+        ]
+        
+        # Webhook payloads don't carry collection membership
+        if "collections" in product:
+            db.execute(product_collections.delete().where(
+                product_collections.c.product_id == product_id
+            ))
+            if product["collections"]:
+                db.execute(product_collections.insert(), [
+                    {
+                        "product_id": product_id,
+                        "collection_id": str(collection["id"]),
+                        "collection_handle": collection.get("handle")
+                    }
+                    for collection in product["collections"]
+                ])
+        
+        db.flush()
+    
+    def _apply(self, obj, values: Dict):
+        for field, value in values.items():
+            setattr(obj, field, value)
+        return obj
+    
+    def rename_collection(self, db: Session, collection_id: str, handle: str):
+        """Record a collection's new handle on its memberships"""
+        db.execute(
+            product_collections.update()
+            .where(product_collections.c.collection_id == str(collection_id))
+            .values(collection_handle=handle)
+        )
+    
+    def remove_collection(self, db: Session, collection_id: str):
+        db.execute(product_collections.delete().where(
+            product_collections.c.collection_id == str(collection_id)
+        ))
+    
+    def delete(self, db: Session, product_id: str):
+        """Remove a product if present"""
+        product_id = str(product_id)
+        db.execute(product_collections.delete().where(
+            product_collections.c.product_id == product_id
+        ))
+        row = db.query(Product).filter(Product.id == product_id).first()
+        if row:
+            db.delete(row)
+    
+    def prune(self, db: Session, keep_ids: Iterable[str]) -> int:
+        """Remove every product not in keep_ids, returning how many were removed"""
+        keep = {str(product_id) for product_id in keep_ids}
+        stale = [
+            product_id for (product_id,) in db.query(Product.id).all()
+            if product_id not in keep
+        ]
+        for product_id in stale:
+            self.delete(db, product_id)
+        return len(stale)
+
+
+catalog_store = CatalogStore(recheck_interval=settings.CATALOG_INDEX_REFRESH_SECONDS)
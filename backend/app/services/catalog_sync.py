@@ -0,0 +1,453 @@
+from typing import AsyncIterator, Dict, Optional, Set
+from datetime import datetime
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from .catalog import CatalogStore, catalog_store
+from .shopify_client import ShopifyClient, shopify_client
+from ..utils.serialization import loads
+import asyncio
+import httpx
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+BULK_PRODUCTS_QUERY = """
+{
+  products {
+    edges {
+      node {
+        id
+        handle
+        title
+        descriptionHtml
+        vendor
+        productType
+        tags
+        createdAt
+        updatedAt
+        publishedAt
+        options { name position values }
+        collections {
+          edges { node { id handle } }
+        }
+        variants {
+          edges {
+            node {
+              id
+              title
+              price
+              compareAtPrice
+              sku
+              position
+              barcode
+              inventoryPolicy
+              inventoryQuantity
+              availableForSale
+              taxable
+              weight
+              weightUnit
+              selectedOptions { name value }
+              image { id }
+              inventoryItem { requiresShipping }
+            }
+          }
+        }
+        images {
+          edges { node { id url altText width height } }
+        }
+      }
+    }
+  }
+}
+"""
+
+RUN_BULK_QUERY_MUTATION = """
+mutation RunBulkQuery($query: String!) {
+  bulkOperationRunQuery(query: $query) {
+    bulkOperation { id status }
+    userErrors { field message }
+  }
+}
+"""
+
+CURRENT_BULK_OPERATION_QUERY = """
+{
+  currentBulkOperation {
+    id
+    status
+    errorCode
+    objectCount
+    url
+  }
+}
+"""
+
+WEIGHT_UNITS = {
+    "GRAMS": "g",
+    "KILOGRAMS": "kg",
+    "OUNCES": "oz",
+    "POUNDS": "lb"
+}
+
+
+def _legacy_id(gid: Optional[str]) -> Optional[int]:
+    """Turn gid://shopify/Product/123 into 123"""
+    if not gid:
+        return None
+    return int(gid.rsplit("/", 1)[-1])
+
+
+def _gid_type(gid: str) -> str:
+    """Turn gid://shopify/Product/123 into Product"""
+    return gid.split("/")[-2]
+
+
+def _normalize_product(node: Dict) -> Dict:
+    """Convert a bulk export product line to the REST Admin API shape"""
+    return {
+        "id": _legacy_id(node["id"]),
+        "title": node["title"],
+        "handle": node["handle"],
+        "body_html": node.get("descriptionHtml"),
+        "vendor": node.get("vendor"),
+        "product_type": node.get("productType"),
+        "created_at": node["createdAt"],
+        "updated_at": node["updatedAt"],
+        "published_at": node.get("publishedAt"),
+        "tags": ", ".join(node.get("tags", [])),
+        "options": node.get("options", []),
+        "variants": [],
+        "images": [],
+        "collections": []
+    }
+
+
+def _normalize_variant(node: Dict, product_id: int) -> Dict:
+    options = [option["value"] for option in node.get("selectedOptions", [])]
+    options += [None] * (3 - len(options))
+    image = node.get("image") or {}
+    inventory_item = node.get("inventoryItem") or {}
+    
+    return {
+        "id": _legacy_id(node["id"]),
+        "product_id": product_id,
+        "title": node["title"],
+        "price": node["price"],
+        "compare_at_price": node.get("compareAtPrice"),
+        "sku": node.get("sku"),
+        "position": node.get("position", 1),
+        "barcode": node.get("barcode"),
+        "inventory_policy": (node.get("inventoryPolicy") or "DENY").lower(),
+        "inventory_quantity": node.get("inventoryQuantity"),
+        "available": node.get("availableForSale", True),
+        "taxable": node.get("taxable", True),
+        "weight": node.get("weight"),
+        "weight_unit": WEIGHT_UNITS.get(node.get("weightUnit"), "oz"),
+        "option1": options[0],
+        "option2": options[1],
+        "option3": options[2],
+        "image_id": _legacy_id(image.get("id")),
+        "requires_shipping": inventory_item.get("requiresShipping", True)
+    }
+
+
+def _normalize_image(node: Dict, product_id: int, position: int) -> Dict:
+    return {
+        "id": _legacy_id(node["id"]),
+        "product_id": product_id,
+        "src": node["url"],
+        "alt": node.get("altText"),
+        "position": position,
+        "width": node.get("width"),
+        "height": node.get("height")
+    }
+
+
+class ShopifyBulkBackend:
+    """Runs catalog exports through Shopify's GraphQL bulk operation API"""
+    
+    def __init__(self, client: ShopifyClient):
+        self.client = client
+    
+    async def start(self) -> str:
+        data = await self.client.graphql(
+            RUN_BULK_QUERY_MUTATION,
+            {"query": BULK_PRODUCTS_QUERY}
+        )
+        result = data["bulkOperationRunQuery"]
+        if result["userErrors"]:
+            raise RuntimeError(f"Bulk operation rejected: {result['userErrors']}")
+        return result["bulkOperation"]["id"]
+    
+    async def poll(self, operation_id: str) -> Dict:
+        data = await self.client.graphql(CURRENT_BULK_OPERATION_QUERY)
+        operation = data["currentBulkOperation"]
+        if not operation or operation["id"] != operation_id:
+            raise RuntimeError(f"Bulk operation {operation_id} is no longer current")
+        return operation
+    
+    async def iter_lines(self, url: str) -> AsyncIterator[str]:
+        # The result lives on Shopify's storage bucket, not the Admin API.
+        # Large exports take a while, so only a stalled connection or read
+        # times out; the sync's own deadline bounds the whole download.
+        timeout = httpx.Timeout(
+            None,
+            connect=settings.SHOPIFY_CONNECT_TIMEOUT_SECONDS,
+            read=settings.SHOPIFY_READ_TIMEOUT_SECONDS
+        )
+        async with httpx.AsyncClient(timeout=timeout) as http_client:
+            async with http_client.stream("GET", url) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    yield line
+
+
+class LocalBulkBackend:
+    """Offline stand-in for the bulk operation API backed by a JSONL file.
+    
+    Set ``SHOPIFY_BULK_LOCAL_FILE`` to a bulk export (one JSON object per
+    line, children pointing at their product through ``__parentId``) to run
+    the sync without a Shopify store.
+    """
+    
+    def __init__(self, path: str, polls_until_complete: int = 1):
+        self.path = path
+        self.polls_until_complete = polls_until_complete
+        self._polls = 0
+    
+    async def start(self) -> str:
+        self._polls = 0
+        return "gid://shopify/BulkOperation/local"
+    
+    async def poll(self, operation_id: str) -> Dict:
+        self._polls += 1
+        if self._polls < self.polls_until_complete:
+            return {"id": operation_id, "status": "RUNNING", "objectCount": "0", "url": None}
+        
+        with open(self.path) as f:
+            object_count = sum(1 for line in f if line.strip())
+        return {
+            "id": operation_id,
+            "status": "COMPLETED",
+            "objectCount": str(object_count),
+            "url": self.path
+        }
+    
+    async def iter_lines(self, url: str) -> AsyncIterator[str]:
+        with open(url) as f:
+            for line in f:
+                yield line
+
+
+class CatalogSyncEngine:
+    """Mirror the Shopify catalog into the local catalog store.
+    
+    A sync starts a bulk export, polls until Shopify has written the JSONL
+    result, then streams the file line by line. Only the product currently
+    being assembled is held in memory; it is written to the store as soon
+    as the next product line starts, and the mirror tables are committed
+    every ``batch_size`` products. Products missing from the export are
+    removed once the stream completes.
+    """
+    
+    def __init__(
+        self,
+        backend,
+        store: CatalogStore,
+        session_factory=SessionLocal,
+        poll_interval: float = 2.0,
+        timeout: float = 1800,
+        batch_size: int = 100
+    ):
+        self.backend = backend
+        self.store = store
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._task: Optional[asyncio.Task] = None
+        self._reset_progress()
+    
+    def _reset_progress(self):
+        self.progress = {
+            "state": "idle",
+            "bulk_operation_id": None,
+            "object_count": 0,
+            "lines_processed": 0,
+            "products_synced": 0,
+            "products_removed": 0,
+            "started_at": None,
+            "finished_at": None,
+            "export_seconds": None,
+            "ingest_seconds": None,
+            "error": None
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def status(self) -> Dict:
+        """Current sync progress for the admin API"""
+        status = dict(self.progress)
+        if status["started_at"] and not status["finished_at"]:
+            status["elapsed_seconds"] = round(
+                (datetime.utcnow() - status["started_at"]).total_seconds(), 3
+            )
+        return status
+    
+    def start(self) -> bool:
+        """Run a sync in the background; returns False if one is already running"""
+        if self.is_running:
+            return False
+        self._task = asyncio.create_task(self.run())
+        return True
+    
+    async def run(self):
+        """Run a full catalog sync"""
+        self._reset_progress()
+        self.progress["state"] = "exporting"
+        self.progress["started_at"] = datetime.utcnow()
+        
+        try:
+            # The timeout covers the whole sync, export and ingest
+            deadline = time.monotonic() + self.timeout
+            
+            started = time.perf_counter()
+            url = await self._export(deadline)
+            self.progress["export_seconds"] = round(time.perf_counter() - started, 3)
+            
+            started = time.perf_counter()
+            self.progress["state"] = "ingesting"
+            try:
+                await asyncio.wait_for(self._ingest(url), max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Catalog sync did not finish within {self.timeout}s")
+            self.progress["ingest_seconds"] = round(time.perf_counter() - started, 3)
+            
+            self.progress["state"] = "completed"
+            logger.info(
+                f"Catalog sync completed: {self.progress['products_synced']} products, "
+                f"{self.progress['products_removed']} removed"
+            )
+        except Exception as e:
+            logger.error(f"Catalog sync failed: {e}")
+            self.progress["state"] = "failed"
+            self.progress["error"] = str(e)
+        finally:
+            self.progress["finished_at"] = datetime.utcnow()
+    
+    async def _export(self, deadline: float) -> Optional[str]:
+        """Start the bulk operation and wait for its result URL"""
+        operation_id = await self.backend.start()
+        self.progress["bulk_operation_id"] = operation_id
+        
+        while True:
+            operation = await self.backend.poll(operation_id)
+            self.progress["object_count"] = int(operation.get("objectCount") or 0)
+            
+            if operation["status"] == "COMPLETED":
+                # No URL means the export matched no objects
+                return operation.get("url")
+            if operation["status"] in ("FAILED", "CANCELED", "EXPIRED"):
+                raise RuntimeError(
+                    f"Bulk operation {operation['status'].lower()}: {operation.get('errorCode')}"
+                )
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Bulk operation did not finish within {self.timeout}s")
+            
+            await asyncio.sleep(self.poll_interval)
+    
+    async def _ingest(self, url: Optional[str]):
+        """Stream the JSONL export into the store"""
+        db = self.session_factory()
+        try:
+            await self._ingest_lines(db, url)
+            db.commit()
+            self.store.refresh_loaded(db)
+        except Exception:
+            db.rollback()
+            # Batches committed before the failure don't count as a sync
+            self.store.refresh_loaded(db)
+            raise
+        finally:
+            db.close()
+        
+        self.store.notify_catalog_reloaded()
+    
+    async def _ingest_lines(self, db: Session, url: Optional[str]):
+        seen: Set[str] = set()
+        current: Optional[Dict] = None
+        
+        if url:
+            async for line in self.backend.iter_lines(url):
+                if not line.strip():
+                    continue
+                self.progress["lines_processed"] += 1
+                node = loads(line)
+                
+                if "__parentId" not in node:
+                    if current:
+                        await self._flush(db, current, seen)
+                    current = _normalize_product(node)
+                    continue
+                
+                parent_id = _legacy_id(node["__parentId"])
+                if current and current["id"] == parent_id:
+                    product = current
+                else:
+                    # Children normally follow their product directly
+                    product = self.store.get(db, parent_id)
+                    if product is None:
+                        logger.warning(f"Skipping bulk line for unknown product {parent_id}")
+                        continue
+                self._attach(product, node)
+                if product is not current:
+                    self.store.upsert(db, product)
+        
+        if current:
+            await self._flush(db, current, seen)
+        
+        self.progress["products_removed"] = self.store.prune(db, seen)
+        self.store.record_sync(db, len(seen))
+    
+    async def _flush(self, db: Session, product: Dict, seen: Set[str]):
+        self.store.upsert(db, product)
+        seen.add(str(product["id"]))
+        self.progress["products_synced"] += 1
+        if self.progress["products_synced"] % self.batch_size == 0:
+            db.commit()
+            # The DB work is synchronous; let other requests and the sync
+            # timeout run between batches
+            await asyncio.sleep(0)
+    
+    def _attach(self, product: Dict, node: Dict):
+        kind = _gid_type(node["id"])
+        if kind == "ProductVariant":
+            product["variants"].append(_normalize_variant(node, product["id"]))
+        elif kind in ("ProductImage", "MediaImage"):
+            product["images"].append(
+                _normalize_image(node, product["id"], len(product["images"]) + 1)
+            )
+        elif kind == "Collection":
+            product["collections"].append({
+                "id": str(_legacy_id(node["id"])),
+                "handle": node.get("handle")
+            })
+
+
+def _bulk_backend():
+    if settings.SHOPIFY_BULK_LOCAL_FILE:
+        return LocalBulkBackend(settings.SHOPIFY_BULK_LOCAL_FILE)
+    return ShopifyBulkBackend(shopify_client)
+
+
+catalog_sync = CatalogSyncEngine(
+    _bulk_backend(),
+    catalog_store,
+    poll_interval=settings.CATALOG_SYNC_POLL_INTERVAL_SECONDS,
+    timeout=settings.CATALOG_SYNC_TIMEOUT_SECONDS
+)
@@ -0,0 +1,150 @@
+from typing import Dict, Optional
+from sqlalchemy.orm import selectinload
+from ..config import settings
+from ..database import SessionLocal
+from ..models.cart import CartSession
+from .cart_cache import cart_cache
+from .shopify_client import shopify_client
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingSync:
+    def __init__(self, deadline: float, latest: float):
+        self.deadline = deadline
+        self.latest = latest
+        self.changed = False
+        self.flush = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+
+class CheckoutSync:
+    """Mirror cart lines to the cart's Shopify checkout in the background.
+    
+    Cart mutations bump ``checkout_version`` and call ``schedule``; the
+    checkout is written once changes to that cart have stopped for
+    ``debounce`` seconds (but no later than ``max_delay`` after the first
+    one), sending whatever the cart holds at that point. A sync records the
+    version it sent in ``checkout_synced_version``, so a cart that is still
+    behind after a restart or on another worker is caught up by ``wait``.
+    """
+    
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        debounce: float = 0.5,
+        max_delay: float = 2.0
+    ):
+        self.session_factory = session_factory
+        self.debounce = debounce
+        self.max_delay = max(max_delay, debounce)
+        self._pending: Dict[int, _PendingSync] = {}
+    
+    def schedule(self, cart_id: int):
+        """Sync the cart's checkout after the current burst of changes"""
+        now = asyncio.get_running_loop().time()
+        pending = self._pending.get(cart_id)
+        if pending is not None:
+            pending.deadline = min(now + self.debounce, pending.latest)
+            pending.changed = True
+            return
+        
+        pending = _PendingSync(now + self.debounce, now + self.max_delay)
+        pending.task = asyncio.create_task(self._run(cart_id, pending))
+        self._pending[cart_id] = pending
+    
+    async def wait(self, cart_id: int):
+        """Bring the cart's checkout up to date before returning.
+        
+        Skips the debounce of a pending sync, and syncs directly when the
+        cart is behind without one pending here.
+        """
+        pending = self._pending.get(cart_id)
+        if pending is not None:
+            pending.flush.set()
+            await asyncio.shield(pending.task)
+        await self.sync(cart_id)
+    
+    async def _run(self, cart_id: int, pending: _PendingSync):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                while not pending.flush.is_set() and loop.time() < pending.deadline:
+                    try:
+                        await asyncio.wait_for(pending.flush.wait(), pending.deadline - loop.time())
+                    except asyncio.TimeoutError:
+                        pass
+                
+                # A wait() that arrives during the sync sets these again
+                pending.changed = False
+                pending.flush.clear()
+                try:
+                    await self.sync(cart_id)
+                except Exception as e:
+                    logger.error(f"Checkout sync failed for cart {cart_id}: {e}")
+                    return
+                
+                # Changed again while the checkout was being written
+                if not pending.changed:
+                    return
+                now = loop.time()
+                pending.deadline = now + self.debounce
+                pending.latest = now + self.max_delay
+        finally:
+            self._pending.pop(cart_id, None)
+    
+    async def sync(self, cart_id: int):
+        """Send the cart's current lines to Shopify if its checkout is behind"""
+        with self.session_factory() as db:
+            cart = db.query(CartSession).options(selectinload(CartSession.items)).filter(
+                CartSession.id == cart_id
+            ).first()
+            if cart is None or cart.checkout_synced_version >= cart.checkout_version:
+                return
+            
+            version = cart.checkout_version
+            session_id = cart.session_id
+            checkout_token = cart.shopify_checkout_token
+            line_items = [
+                {
+                    "variant_id": item.shopify_variant_id,
+                    "quantity": item.quantity,
+                    "properties": item.properties
+                }
+                for item in cart.items
+            ]
+        
+        updates = {"checkout_synced_version": version}
+        if checkout_token:
+            await shopify_client.update_checkout(checkout_token, {"line_items": line_items})
+        elif line_items:
+            checkout_data = await shopify_client.create_checkout(line_items)
+            updates.update(
+                shopify_checkout_id=checkout_data["id"],
+                shopify_checkout_token=checkout_data["token"],
+                checkout_url=checkout_data["web_url"]
+            )
+        
+        with self.session_factory() as db:
+            db.query(CartSession).filter(
+                CartSession.id == cart_id,
+                CartSession.checkout_synced_version < version
+            ).update(updates, synchronize_session=False)
+            db.commit()
+        
+        # The cached cart carries the checkout fields
+        await cart_cache.invalidate(session_id)
+    
+    async def close(self):
+        """Stop pending syncs; carts left behind are caught up by ``wait``"""
+        for pending in list(self._pending.values()):
+            pending.task.cancel()
+        self._pending.clear()
+
+
+checkout_sync = CheckoutSync(
+    debounce=settings.CHECKOUT_SYNC_DEBOUNCE_SECONDS,
+    max_delay=settings.CHECKOUT_SYNC_MAX_DELAY_SECONDS
+)
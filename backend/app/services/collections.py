@@ -0,0 +1,34 @@
+from typing import Dict, List, Optional
+from .cache import catalog_cache
+from .shopify_client import shopify_client
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+COLLECTIONS_KEY = "collections:all"
+
+
+async def _fetch_collections() -> List[Dict]:
+    custom, smart = await asyncio.gather(
+        shopify_client.get_custom_collections(),
+        shopify_client.get_smart_collections()
+    )
+    return [*custom, *smart]
+
+
+async def get_all_collections() -> List[Dict]:
+    """Custom and smart collections, cached until a collection webhook arrives"""
+    return await catalog_cache.get_or_load(COLLECTIONS_KEY, _fetch_collections)
+
+
+async def resolve_collection_id(handle: str) -> Optional[str]:
+    """Map a collection handle to its Shopify ID without a per-request lookup"""
+    for collection in await get_all_collections():
+        if collection["handle"] == handle:
+            return str(collection["id"])
+    return None
+
+
+async def invalidate_collections():
+    await catalog_cache.invalidate_prefix("collections:")
@@ -1,8 +1,6 @@
-import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import List, Optional
-from jinja2 import Environment, FileSystemLoader
 from ..config import settings
 import logging
 import os
@@ -18,10 +16,17 @@ class EmailService:
         self.smtp_password = settings.SMTP_PASSWORD
         self.from_email = settings.SMTP_FROM_EMAIL
         self.from_name = settings.SMTP_FROM_NAME
-        
-        # Setup Jinja2 for email templates
-        template_dir = os.path.join(os.path.dirname(__file__), "..", "templates", "emails")
-        self.env = Environment(loader=FileSystemLoader(template_dir))
+        self._env = None
+    
+    @property
+    def env(self):
+        """Jinja2 environment for email templates, built on first use"""
+        if self._env is None:
+            from jinja2 import Environment, FileSystemLoader
+            
+            template_dir = os.path.join(os.path.dirname(__file__), "..", "templates", "emails")
+            self._env = Environment(loader=FileSystemLoader(template_dir))
+        return self._env
     
     async def send_email(
         self,
@@ -36,6 +41,8 @@ class EmailService:
             return False
             
         try:
+            import aiosmtplib
+            
             message = MIMEMultipart("alternative")
             message["From"] = f"{self.from_name} <{self.from_email}>"
             message["To"] = to_email
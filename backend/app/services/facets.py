@@ -0,0 +1,138 @@
+from typing import Dict, Iterable, List, Optional, Set
+from collections import defaultdict
+from sqlalchemy.orm import Session
+from ..config import settings
+from .catalog import CatalogStore, catalog_store
+import bisect
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+FACETS = ("flavor", "pack_size", "collection", "tag", "available")
+
+
+def _facet_values(projection: Dict, collections: Iterable[str]) -> Dict[str, Set[str]]:
+    """Index terms for each facet of a product"""
+    return {
+        "flavor": {projection["flavor"]} if projection.get("flavor") else set(),
+        "pack_size": set(projection.get("pack_sizes", [])),
+        "collection": set(collections),
+        "tag": {tag.strip().lower() for tag in projection.get("tags", []) if tag.strip()},
+        "available": {
+            "true" if any(v.get("available") for v in projection.get("variants", [])) else "false"
+        }
+    }
+
+
+class FacetIndex:
+    """Inverted index from facet values to products.
+    
+    Maps every flavor, pack size, collection handle, tag and availability
+    value to the set of product IDs that carry it, so filtered listings
+    and facet counts are answered from memory without scanning the
+    catalog. Updates are applied incrementally by webhooks; the whole
+    index is also rebuilt from the catalog mirror after a sync and every
+    ``refresh_interval`` seconds so workers that didn't receive a webhook
+    converge.
+    """
+    
+    def __init__(self, store: CatalogStore, refresh_interval: float = 30):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self._postings: Dict[str, Dict[str, Set[str]]] = {facet: defaultdict(set) for facet in FACETS}
+        self._terms: Dict[str, Dict[str, Set[str]]] = {}
+        self._projections: Dict[str, Dict] = {}
+        self._order: List[tuple] = []
+        self._built_at: Optional[float] = None
+    
+    def invalidate(self):
+        """Force a rebuild on next use"""
+        self._built_at = None
+    
+    def ensure_fresh(self, db: Session):
+        if self._built_at is None or time.monotonic() - self._built_at > self.refresh_interval:
+            self.rebuild(self.store.index_entries(db))
+    
+    def rebuild(self, entries: Iterable[Dict]):
+        self._postings = {facet: defaultdict(set) for facet in FACETS}
+        self._terms = {}
+        self._projections = {}
+        self._order = []
+        for entry in entries:
+            self.add(entry["projection"], entry["collections"])
+        self._built_at = time.monotonic()
+    
+    def add(self, projection: Dict, collections: Optional[Iterable[str]] = None):
+        """Index a product, replacing any previous version.
+        
+        When collections is None the product keeps its current collection
+        membership (webhook payloads don't include it).
+        """
+        product_id = projection["id"]
+        if collections is None:
+            collections = self._terms.get(product_id, {}).get("collection", set())
+        self.remove(product_id)
+        
+        terms = _facet_values(projection, collections)
+        for facet, values in terms.items():
+            for value in values:
+                self._postings[facet][value].add(product_id)
+        self._terms[product_id] = terms
+        self._projections[product_id] = projection
+        bisect.insort(self._order, (projection["created_at"], product_id))
+    
+    def remove(self, product_id: str):
+        product_id = str(product_id)
+        terms = self._terms.pop(product_id, None)
+        if terms is None:
+            return
+        
+        for facet, values in terms.items():
+            for value in values:
+                postings = self._postings[facet][value]
+                postings.discard(product_id)
+                if not postings:
+                    del self._postings[facet][value]
+        projection = self._projections.pop(product_id)
+        self._order.remove((projection["created_at"], product_id))
+    
+    def _matching(self, filters: Dict[str, str], exclude: Optional[str] = None) -> Set[str]:
+        matched = None
+        for facet, value in filters.items():
+            if value is None or facet == exclude:
+                continue
+            postings = self._postings[facet].get(value, set())
+            matched = set(postings) if matched is None else matched & postings
+        return set(self._projections) if matched is None else matched
+    
+    def search(self, filters: Dict[str, str], limit: Optional[int] = None) -> List[Dict]:
+        """Projections matching every filter, oldest first"""
+        matched = self._matching(filters)
+        result = []
+        for _, product_id in self._order:
+            if product_id in matched:
+                result.append(self._projections[product_id])
+                if limit and len(result) >= limit:
+                    break
+        return result
+    
+    def facet_counts(self, filters: Dict[str, str]) -> Dict[str, Dict[str, int]]:
+        """Number of products per facet value.
+        
+        Each facet is counted against the other active filters, so picking
+        a flavor still shows how many products the other flavors have.
+        """
+        counts = {}
+        for facet in FACETS:
+            matched = self._matching(filters, exclude=facet)
+            counts[facet] = {
+                value: len(postings & matched)
+                for value, postings in sorted(self._postings[facet].items())
+                if postings & matched
+            }
+        return counts
+
+
+facet_index = FacetIndex(catalog_store, refresh_interval=settings.CATALOG_INDEX_REFRESH_SECONDS)
+catalog_store.subscribe(facet_index)
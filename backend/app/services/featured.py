@@ -0,0 +1,132 @@
+from typing import Dict, Iterable, List, Optional
+from collections import Counter
+from datetime import date, datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.product import ProductSales
+from .catalog import CatalogStore, catalog_store
+import heapq
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _order_day(order: Dict) -> date:
+    created_at = order.get("created_at")
+    if created_at:
+        return datetime.fromisoformat(created_at.replace("Z", "+00:00")).date()
+    return date.today()
+
+
+def record_order_sales(db: Session, order: Dict) -> Dict[str, int]:
+    """Add an order's line items to the daily sales buckets.
+    
+    Returns units per product so the caller can update the featured index
+    once the transaction commits.
+    """
+    quantities = Counter()
+    for item in order.get("line_items", []):
+        if item.get("product_id"):
+            quantities[str(item["product_id"])] += item.get("quantity") or 0
+    
+    if not quantities:
+        return {}
+    
+    # Upsert so concurrent orders for the same product and day both count
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    day = _order_day(order)
+    stmt = insert(ProductSales).values([
+        {"product_id": product_id, "day": day, "quantity": quantity}
+        for product_id, quantity in quantities.items()
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[ProductSales.product_id, ProductSales.day],
+        set_={"quantity": ProductSales.quantity + stmt.excluded.quantity}
+    ))
+    return dict(quantities)
+
+
+class FeaturedIndex:
+    """Precomputed featured products for the homepage.
+    
+    Products rank by their award-winning and bestseller badges, then by
+    units sold over the last ``window_days`` days. Unbadged products only
+    appear when they have recent sales. The ranking is recomputed only
+    after a product or sales change, so reads are a list copy. Like the
+    other catalog indexes it follows webhooks and is rebuilt from the
+    mirror every ``refresh_interval`` seconds.
+    """
+    
+    def __init__(
+        self,
+        store: CatalogStore,
+        refresh_interval: float = 30,
+        window_days: int = 30,
+        size: int = 6
+    ):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self.window_days = window_days
+        self.size = size
+        self._projections: Dict[str, Dict] = {}
+        self._sales: Counter = Counter()
+        self._featured: Optional[List[Dict]] = None
+        self._built_at: Optional[float] = None
+    
+    def invalidate(self):
+        """Force a rebuild on next use"""
+        self._built_at = None
+    
+    def ensure_fresh(self, db: Session):
+        if self._built_at is None or time.monotonic() - self._built_at > self.refresh_interval:
+            self.rebuild(self.store.index_entries(db), self._recent_sales(db))
+    
+    def _recent_sales(self, db: Session) -> Dict[str, int]:
+        since = date.today() - timedelta(days=self.window_days)
+        rows = db.query(ProductSales.product_id, func.sum(ProductSales.quantity)).filter(
+            ProductSales.day >= since
+        ).group_by(ProductSales.product_id).all()
+        return {product_id: int(quantity or 0) for product_id, quantity in rows}
+    
+    def rebuild(self, entries: Iterable[Dict], sales: Optional[Dict[str, int]] = None):
+        self._projections = {entry["projection"]["id"]: entry["projection"] for entry in entries}
+        self._sales = Counter(sales or {})
+        self._featured = None
+        self._built_at = time.monotonic()
+    
+    def add(self, projection: Dict, collections: Optional[Iterable[str]] = None):
+        self._projections[projection["id"]] = projection
+        self._featured = None
+    
+    def remove(self, product_id: str):
+        if self._projections.pop(str(product_id), None) is not None:
+            self._featured = None
+    
+    def record_sales(self, quantities: Dict[str, int]):
+        self._sales.update(quantities)
+        self._featured = None
+    
+    def _rank(self, projection: Dict):
+        badges = int(projection["is_award_winning"]) + int(projection["is_bestseller"])
+        return (-badges, -self._sales[projection["id"]], projection["created_at"], projection["id"])
+    
+    def top(self) -> List[Dict]:
+        if self._featured is None:
+            candidates = (
+                p for p in self._projections.values()
+                if p["is_award_winning"] or p["is_bestseller"] or self._sales[p["id"]] > 0
+            )
+            self._featured = heapq.nsmallest(self.size, candidates, key=self._rank)
+        return list(self._featured)
+
+
+featured_index = FeaturedIndex(
+    catalog_store,
+    refresh_interval=settings.CATALOG_INDEX_REFRESH_SECONDS,
+    window_days=settings.FEATURED_SALES_WINDOW_DAYS,
+    size=settings.FEATURED_PRODUCTS_COUNT
+)
+catalog_store.subscribe(featured_index)
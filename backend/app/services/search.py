@@ -0,0 +1,246 @@
+from typing import Dict, Iterable, List, Optional, Set
+from collections import Counter, defaultdict
+from sqlalchemy.orm import Session
+from ..config import settings
+from .catalog import CatalogStore, catalog_store
+import heapq
+import logging
+import math
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+TAG_RE = re.compile(r"<[^>]+>")
+
+# Title hits outrank tag and SKU hits, which outrank description hits
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "sku": 2.0, "body": 1.0}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return TOKEN_RE.findall(TAG_RE.sub(" ", text).lower())
+
+
+def _weighted_terms(projection: Dict) -> Counter:
+    """Term frequencies of a product, weighted by field"""
+    fields = {
+        "title": tokenize(projection.get("title")),
+        "tags": tokenize(" ".join(projection.get("tags", []))),
+        "sku": [],
+        "body": tokenize(projection.get("body_html"))
+    }
+    for variant in projection.get("variants", []):
+        sku = (variant.get("sku") or "").lower()
+        if sku:
+            # Match the whole SKU as well as its parts
+            fields["sku"].extend(TOKEN_RE.findall(sku))
+            fields["sku"].append(sku)
+    
+    terms = Counter()
+    for field, tokens in fields.items():
+        for token in tokens:
+            terms[token] += FIELD_WEIGHTS[field]
+    return terms
+
+
+class _TrieNode:
+    __slots__ = ("children", "terminal")
+    
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.terminal = False
+
+
+class PrefixTrie:
+    """Prefix tree over the index vocabulary for autocomplete"""
+    
+    def __init__(self):
+        self.root = _TrieNode()
+    
+    def insert(self, term: str):
+        node = self.root
+        for char in term:
+            node = node.children.setdefault(char, _TrieNode())
+        node.terminal = True
+    
+    def discard(self, term: str):
+        node = self.root
+        for char in term:
+            node = node.children.get(char)
+            if node is None:
+                return
+        node.terminal = False
+    
+    def complete(self, prefix: str) -> Iterable[str]:
+        """Every term starting with prefix"""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return
+        
+        stack = [(node, prefix)]
+        while stack:
+            node, term = stack.pop()
+            if node.terminal:
+                yield term
+            for char, child in node.children.items():
+                stack.append((child, term + char))
+
+
+class SearchIndex:
+    """Full-text index over the local catalog mirror.
+    
+    Title, description, tags and variant SKUs are tokenized into an
+    in-memory inverted index ranked with BM25, and the vocabulary is kept
+    in a prefix trie so the last word of a query can be completed on every
+    keystroke. Like ``FacetIndex`` it is updated by webhooks and rebuilt
+    from the mirror after a sync and every ``refresh_interval`` seconds.
+    """
+    
+    def __init__(self, store: CatalogStore, refresh_interval: float = 30):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._terms: Dict[str, Counter] = {}
+        self._lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._projections: Dict[str, Dict] = {}
+        self._trie = PrefixTrie()
+        self._built_at: Optional[float] = None
+    
+    def invalidate(self):
+        """Force a rebuild on next use"""
+        self._built_at = None
+    
+    def ensure_fresh(self, db: Session):
+        if self._built_at is None or time.monotonic() - self._built_at > self.refresh_interval:
+            self.rebuild(self.store.index_entries(db))
+    
+    def rebuild(self, entries: Iterable[Dict]):
+        self._postings = defaultdict(dict)
+        self._terms = {}
+        self._lengths = {}
+        self._total_length = 0.0
+        self._projections = {}
+        self._trie = PrefixTrie()
+        for entry in entries:
+            self.add(entry["projection"])
+        self._built_at = time.monotonic()
+    
+    def add(self, projection: Dict, collections: Optional[Iterable[str]] = None):
+        """Index a product, replacing any previous version"""
+        product_id = projection["id"]
+        self.remove(product_id)
+        
+        terms = _weighted_terms(projection)
+        for term, weight in terms.items():
+            if term not in self._postings:
+                self._trie.insert(term)
+            self._postings[term][product_id] = weight
+        self._terms[product_id] = terms
+        self._lengths[product_id] = sum(terms.values())
+        self._total_length += self._lengths[product_id]
+        self._projections[product_id] = projection
+    
+    def remove(self, product_id: str):
+        product_id = str(product_id)
+        terms = self._terms.pop(product_id, None)
+        if terms is None:
+            return
+        
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[term]
+                self._trie.discard(term)
+        self._total_length -= self._lengths.pop(product_id)
+        del self._projections[product_id]
+    
+    def _expand(self, token: str, prefix: bool) -> Set[str]:
+        if prefix:
+            return set(self._trie.complete(token))
+        return {token} if token in self._postings else set()
+    
+    def _score(self, query: str, prefix: bool) -> Dict[str, float]:
+        """BM25 scores of products matching every query word.
+        
+        With prefix set the last word also matches any term it starts.
+        """
+        tokens = tokenize(query)
+        if not tokens or not self._projections:
+            return {}
+        
+        count = len(self._projections)
+        average_length = self._total_length / count
+        scores: Optional[Dict[str, float]] = None
+        for position, token in enumerate(tokens):
+            expanded = self._expand(token, prefix and position == len(tokens) - 1)
+            token_scores: Dict[str, float] = {}
+            for term in expanded:
+                postings = self._postings[term]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for product_id, tf in postings.items():
+                    norm = K1 * (1 - B + B * self._lengths[product_id] / average_length)
+                    score = idf * tf * (K1 + 1) / (tf + norm)
+                    token_scores[product_id] = max(token_scores.get(product_id, 0.0), score)
+            
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    product_id: score + token_scores[product_id]
+                    for product_id, score in scores.items()
+                    if product_id in token_scores
+                }
+            if not scores:
+                return {}
+        return scores
+    
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """Best matching projections, highest score first"""
+        scores = self._score(query, prefix=True)
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+        return [self._projections[product_id] for product_id, _ in ranked]
+    
+    def suggest(self, query: str, limit: int = 8) -> Dict[str, List]:
+        """Query completions and matching products for autocomplete"""
+        tokens = tokenize(query)
+        if not tokens:
+            return {"terms": [], "products": []}
+        
+        # Complete the last word with terms that occur alongside the
+        # earlier words, most common first
+        head = " ".join(tokens[:-1])
+        candidates = self._trie.complete(tokens[-1])
+        if head:
+            head_ids = self._score(head, prefix=False).keys()
+            candidates = (
+                term for term in candidates
+                if not self._postings[term].keys().isdisjoint(head_ids)
+            )
+        completions = heapq.nlargest(
+            limit,
+            candidates,
+            key=lambda term: (len(self._postings[term]), term)
+        )
+        products = [
+            {"id": p["id"], "title": p["title"], "handle": p["handle"]}
+            for p in self.search(query, limit=limit)
+        ]
+        return {
+            "terms": [f"{head} {term}".strip() for term in completions],
+            "products": products
+        }
+
+
+search_index = SearchIndex(catalog_store, refresh_interval=settings.CATALOG_INDEX_REFRESH_SECONDS)
+catalog_store.subscribe(search_index)
@@ -1,8 +1,218 @@
-import shopify
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, AsyncIterator
 from ..config import settings
+from ..utils.serialization import loads
+from enum import IntEnum
+import asyncio
+import heapq
 import httpx
+import itertools
+import logging
+import random
+import time
 from datetime import datetime
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Gateway and server errors that are usually gone on the next attempt
+RETRY_STATUSES = {500, 502, 503, 504}
+
+# Failures where the request was never sent, so even a POST can be retried
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class RequestPriority(IntEnum):
+    """Scheduling priority for Shopify API calls (lower runs first)"""
+    INTERACTIVE = 0  # Storefront reads and cart writes
+    BACKGROUND = 1   # Admin dashboards and catalog sync
+
+
+class ShopifyRateLimiter:
+    """Leaky-bucket scheduler for the Shopify REST Admin API.
+    
+    Shopify allows a burst of ``bucket_size`` calls that drains at
+    ``leak_rate`` calls per second and reports the current fill in the
+    ``X-Shopify-Shop-Api-Call-Limit`` header. We keep a local estimate of
+    the bucket, correct it from every response, and make callers wait
+    until a slot is free. Waiters are served in priority order and
+    background calls leave ``background_reserve`` slots for interactive
+    traffic so a running sync never starves the storefront.
+    """
+    
+    def __init__(
+        self,
+        bucket_size: int = 40,
+        leak_rate: float = 2.0,
+        background_reserve: int = 10
+    ):
+        self.bucket_size = bucket_size
+        self.leak_rate = leak_rate
+        self.background_reserve = background_reserve
+        self._level = 0.0
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters: List[tuple] = []
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Condition] = None
+
+    @property
+    def level(self) -> float:
+        """Estimated number of calls currently in the bucket"""
+        self._leak()
+        return self._level
+    
+    def _leak(self):
+        now = time.monotonic()
+        self._level = max(0.0, self._level - (now - self._updated_at) * self.leak_rate)
+        self._updated_at = now
+    
+    def _delay(self, priority: RequestPriority) -> float:
+        """Seconds until a call at this priority may be sent"""
+        self._leak()
+        limit = self.bucket_size - 1
+        if priority == RequestPriority.BACKGROUND:
+            limit -= self.background_reserve
+        
+        delay = (self._level + 1 - limit) / self.leak_rate
+        return max(delay, self._blocked_until - time.monotonic(), 0.0)
+    
+    async def acquire(self, priority: RequestPriority = RequestPriority.INTERACTIVE):
+        """Wait for a free slot in the bucket and claim it"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Condition()
+        
+        ticket = (priority, next(self._counter))
+        heapq.heappush(self._waiters, ticket)
+        try:
+            async with self._wakeup:
+                # Let the current head re-check now that someone may outrank it
+                self._wakeup.notify_all()
+                while True:
+                    timeout = None
+                    if self._waiters[0] == ticket:
+                        timeout = self._delay(priority)
+                        if timeout <= 0:
+                            break
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                
+                heapq.heappop(self._waiters)
+                self._level += 1
+                self._wakeup.notify_all()
+        except BaseException:
+            if ticket in self._waiters:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                # The next waiter may be the head now and only wakes when notified
+                asyncio.get_running_loop().create_task(self._notify_waiters())
+            raise
+    
+    async def _notify_waiters(self):
+        async with self._wakeup:
+            self._wakeup.notify_all()
+    
+    def update(self, response: httpx.Response):
+        """Sync the bucket estimate with Shopify's view of it"""
+        call_limit = response.headers.get("X-Shopify-Shop-Api-Call-Limit")
+        if call_limit:
+            try:
+                used, size = call_limit.split("/")
+                self.bucket_size = int(size)
+                self._level = float(used)
+                self._updated_at = time.monotonic()
+            except ValueError:
+                logger.warning(f"Unexpected Shopify call limit header: {call_limit}")
+        
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get("Retry-After", 2.0))
+            except ValueError:
+                retry_after = 2.0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            self._level = float(self.bucket_size)
+            self._updated_at = time.monotonic()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Shopify while the circuit breaker is open"""
+    
+    def __init__(self, retry_after: float):
+        super().__init__(f"Shopify circuit open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Stops calling Shopify after a run of failures.
+    
+    A call counts as failed when it raises, returns a 5xx or takes longer
+    than ``slow_call_seconds``. After ``failure_threshold`` consecutive
+    failures the breaker opens and calls fail fast with
+    ``CircuitOpenError`` for ``reset_seconds``. It then half-opens and
+    lets a single probe through; the probe's outcome closes or re-opens
+    the breaker.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        slow_call_seconds: float = 5.0,
+        reset_seconds: float = 30.0
+    ):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+    
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.reset_seconds:
+            return self.OPEN
+        return self.HALF_OPEN
+    
+    def retry_after(self) -> float:
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_seconds - time.monotonic())
+    
+    def before_call(self):
+        """Claim permission to call Shopify or raise CircuitOpenError"""
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._probing):
+            raise CircuitOpenError(self.retry_after() or self.reset_seconds)
+        if state == self.HALF_OPEN:
+            self._probing = True
+    
+    def abandon(self):
+        """Release a half-open probe that ended without an outcome"""
+        self._probing = False
+    
+    def record(self, success: bool, elapsed: float = 0.0):
+        self._probing = False
+        if success and elapsed <= self.slow_call_seconds:
+            if self._opened_at is not None:
+                logger.info("Shopify circuit closed")
+            self.failures = 0
+            self._opened_at = None
+            return
+        
+        self.failures += 1
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.error(f"Shopify circuit opened after {self.failures} failed or slow calls")
+            self._opened_at = time.monotonic()
 
 
 class ShopifyClient:
@@ -11,46 +221,326 @@ class ShopifyClient:
         self.api_version = settings.SHOPIFY_API_VERSION
         self.access_token = settings.SHOPIFY_ACCESS_TOKEN
         
-        # Initialize Shopify session
-        self.session = shopify.Session(
-            self.shop_url,
-            self.api_version,
-            self.access_token
+        # HTTP client, created on first use inside the running event loop
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self.max_retries = settings.SHOPIFY_RETRIES
+        self.retry_backoff = settings.SHOPIFY_RETRY_BACKOFF_SECONDS
+        self.retry_max_backoff = settings.SHOPIFY_RETRY_MAX_BACKOFF_SECONDS
+        self.hedge_after = settings.SHOPIFY_HEDGE_AFTER_SECONDS
+        
+        # Pace requests against Shopify's API call limit
+        self.rate_limiter = ShopifyRateLimiter(
+            bucket_size=settings.SHOPIFY_API_BUCKET_SIZE,
+            leak_rate=settings.SHOPIFY_API_LEAK_RATE,
+            background_reserve=settings.SHOPIFY_API_BACKGROUND_RESERVE
         )
-        shopify.ShopifyResource.activate_session(self.session)
+        self.max_rate_limit_retries = settings.SHOPIFY_RATE_LIMIT_RETRIES
         
-        # HTTP client for custom requests
-        self.http_client = httpx.AsyncClient(
+        # Fail fast while Shopify is down instead of waiting out timeouts
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.SHOPIFY_BREAKER_FAILURE_THRESHOLD,
+            slow_call_seconds=settings.SHOPIFY_BREAKER_SLOW_CALL_SECONDS,
+            reset_seconds=settings.SHOPIFY_BREAKER_RESET_SECONDS
+        )
+        
+        # Upstream GETs currently in flight, keyed by URL and query
+        self._in_flight: Dict[str, asyncio.Future] = {}
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = self._build_http_client()
+        return self._http_client
+    
+    def _build_http_client(self) -> httpx.AsyncClient:
+        http2 = settings.SHOPIFY_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("SHOPIFY_HTTP2 is set but h2 is not installed, using HTTP/1.1")
+                http2 = False
+        
+        return httpx.AsyncClient(
             base_url=f"{self.shop_url}/admin/api/{self.api_version}",
             headers={
                 "X-Shopify-Access-Token": self.access_token,
                 "Content-Type": "application/json"
-            }
+            },
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.SHOPIFY_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SHOPIFY_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.SHOPIFY_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.SHOPIFY_CONNECT_TIMEOUT_SECONDS,
+                read=settings.SHOPIFY_READ_TIMEOUT_SECONDS,
+                write=settings.SHOPIFY_WRITE_TIMEOUT_SECONDS,
+                pool=settings.SHOPIFY_POOL_TIMEOUT_SECONDS
+            )
+        )
+    
+    async def warm_up(self, connections: int = 2):
+        """Open connections to Shopify ahead of the first real request.
+        
+        Pays for DNS and the TLS handshake at startup. Failures are only
+        logged since the app can still start and connect lazily.
+        """
+        if connections <= 0:
+            return
+        
+        results = await asyncio.gather(
+            *(
+                self._send("GET", "/shop.json", RequestPriority.BACKGROUND, params={"fields": "id"})
+                for _ in range(connections)
+            ),
+            return_exceptions=True
+        )
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors:
+            logger.warning(f"Could not pre-warm Shopify connections: {errors[0]!r}")
+    
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number attempt"""
+        return random.uniform(0, min(self.retry_max_backoff, self.retry_backoff * 2 ** attempt))
+    
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        priority: RequestPriority,
+        **kwargs
+    ) -> httpx.Response:
+        """Send one request through the rate limiter"""
+        await self.rate_limiter.acquire(priority)
+        response = await self.http_client.request(method, url, **kwargs)
+        self.rate_limiter.update(response)
+        return response
+    
+    def _can_hedge(self, method: str, priority: RequestPriority) -> bool:
+        # Only storefront reads, and never at the expense of the rate limit
+        limiter = self.rate_limiter
+        return (
+            self.hedge_after is not None
+            and method in IDEMPOTENT_METHODS
+            and priority == RequestPriority.INTERACTIVE
+            and limiter.level + 2 < limiter.bucket_size - limiter.background_reserve
         )
     
-    async def get_products(self, limit: int = 50, collection_id: Optional[str] = None) -> List[Dict]:
+    async def _send_hedged(
+        self,
+        method: str,
+        url: str,
+        priority: RequestPriority,
+        **kwargs
+    ) -> httpx.Response:
+        """Send a request and, if it is slow, a duplicate; first answer wins"""
+        primary = asyncio.ensure_future(self._send(method, url, priority, **kwargs))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_after)
+            if not done:
+                logger.info(f"Hedging slow Shopify request {method} {url}")
+                pending.add(asyncio.ensure_future(self._send(method, url, priority, **kwargs)))
+            
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        **kwargs
+    ) -> httpx.Response:
+        """Send a request, retrying on 429 and on transient failures.
+        
+        Throttled requests are resent for any method. Connection failures,
+        timeouts and 5xx gateway errors are retried with jittered
+        exponential backoff for idempotent methods only, except for
+        connection errors where the request never left this process.
+        """
+        self.breaker.before_call()
+        try:
+            response = await self._request_with_retries(method, url, priority, **kwargs)
+        except httpx.TransportError:
+            self.breaker.record(False)
+            raise
+        except BaseException:
+            self.breaker.abandon()
+            raise
+        
+        # Judge Shopify by its own latency, not time spent queued for the rate limit
+        self.breaker.record(response.status_code < 500, response.elapsed.total_seconds())
+        
+        response.raise_for_status()
+        return response
+    
+    async def _request_with_retries(
+        self,
+        method: str,
+        url: str,
+        priority: RequestPriority,
+        **kwargs
+    ) -> httpx.Response:
+        idempotent = method in IDEMPOTENT_METHODS
+        attempt = 0
+        throttled = 0
+        while True:
+            try:
+                if self._can_hedge(method, priority):
+                    response = await self._send_hedged(method, url, priority, **kwargs)
+                else:
+                    response = await self._send(method, url, priority, **kwargs)
+            except httpx.TransportError as e:
+                retryable = idempotent or isinstance(e, UNSENT_ERRORS)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                delay = self._backoff(attempt)
+                logger.warning(f"Shopify {method} {url} failed ({e!r}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            # A throttled request was not processed, so any method is safe to resend
+            if response.status_code == 429 and throttled < self.max_rate_limit_retries:
+                throttled += 1
+                logger.warning(
+                    f"Shopify rate limit hit on {method} {url}, "
+                    f"retrying after {response.headers.get('Retry-After', '2.0')}s"
+                )
+                continue
+            
+            if idempotent and response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                attempt += 1
+                delay = self._backoff(attempt)
+                logger.warning(
+                    f"Shopify {method} {url} returned {response.status_code}, "
+                    f"retry {attempt} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            
+            return response
+    
+    async def _get(
+        self,
+        url: str,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        params: Optional[Dict] = None
+    ) -> Dict:
+        """GET a JSON payload, sharing one upstream call between concurrent callers.
+        
+        Identical GETs issued while a request is already in flight wait on
+        that request instead of sending their own. The entry is dropped as
+        soon as the request completes, so no result outlives its response.
+        The payload is shared between callers and must not be mutated.
+        """
+        key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+        in_flight = self._in_flight.get(key)
+        if in_flight is None:
+            in_flight = asyncio.ensure_future(self._fetch_json(url, priority, params))
+            self._in_flight[key] = in_flight
+            in_flight.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        
+        # A cancelled waiter must not cancel the request for everyone else
+        return await asyncio.shield(in_flight)
+    
+    async def _fetch_json(
+        self,
+        url: str,
+        priority: RequestPriority,
+        params: Optional[Dict]
+    ) -> Dict:
+        """Send a GET and decode its JSON body"""
+        response = await self._request("GET", url, priority, params=params)
+        return loads(response.content)
+    
+    async def get_products(
+        self,
+        limit: int = 50,
+        collection_id: Optional[str] = None,
+        priority: RequestPriority = RequestPriority.INTERACTIVE
+    ) -> List[Dict]:
         """Get products from Shopify store"""
         params = {"limit": limit}
         if collection_id:
             params["collection_id"] = collection_id
-            
-        response = await self.http_client.get("/products.json", params=params)
-        response.raise_for_status()
-        return response.json()["products"]
+        
+        data = await self._get("/products.json", priority, params=params)
+        return data["products"]
+    
+    async def iter_products(
+        self,
+        page_size: int = 250,
+        collection_id: Optional[str] = None,
+        priority: RequestPriority = RequestPriority.BACKGROUND
+    ) -> AsyncIterator[List[Dict]]:
+        """Iterate over every product, one page at a time"""
+        params = {"limit": page_size}
+        if collection_id:
+            params["collection_id"] = collection_id
+        
+        async for page in self._iter_pages("/products.json", "products", params, priority):
+            yield page
     
     async def get_product(self, product_id: str) -> Dict:
         """Get single product by ID"""
-        response = await self.http_client.get(f"/products/{product_id}.json")
-        response.raise_for_status()
-        return response.json()["product"]
+        data = await self._get(f"/products/{product_id}.json")
+        return data["product"]
     
     async def get_product_by_handle(self, handle: str) -> Optional[Dict]:
         """Get product by handle/slug"""
-        response = await self.http_client.get(f"/products.json?handle={handle}")
-        response.raise_for_status()
-        products = response.json()["products"]
+        data = await self._get(f"/products.json?handle={handle}")
+        products = data["products"]
         return products[0] if products else None
     
+    async def get_variant(self, variant_id: str) -> Dict:
+        """Get single product variant by ID"""
+        data = await self._get(f"/variants/{variant_id}.json")
+        return data["variant"]
+    
+    async def get_collection_by_handle(self, handle: str) -> Optional[Dict]:
+        """Get collection by handle/slug"""
+        data = await self._get(f"/collections.json?handle={handle}")
+        collections = data["collections"]
+        return collections[0] if collections else None
+    
+    async def get_custom_collections(
+        self,
+        priority: RequestPriority = RequestPriority.INTERACTIVE
+    ) -> List[Dict]:
+        """Get every manually curated collection"""
+        return await self._get_all_pages("/custom_collections.json", "custom_collections", priority)
+    
+    async def get_smart_collections(
+        self,
+        priority: RequestPriority = RequestPriority.INTERACTIVE
+    ) -> List[Dict]:
+        """Get every rule-based collection"""
+        return await self._get_all_pages("/smart_collections.json", "smart_collections", priority)
+    
+    async def get_count(
+        self,
+        resource: str,
+        params: Optional[Dict] = None,
+        priority: RequestPriority = RequestPriority.INTERACTIVE
+    ) -> int:
+        """Get the number of records for a resource (orders, customers, products)"""
+        data = await self._get(f"/{resource}/count.json", priority, params=params)
+        return data["count"]
+    
     async def create_checkout(self, line_items: List[Dict]) -> Dict:
         """Create a new checkout"""
         checkout_data = {
@@ -63,90 +553,182 @@ class ShopifyClient:
             }
         }
         
-        response = await self.http_client.post("/checkouts.json", json=checkout_data)
-        response.raise_for_status()
-        return response.json()["checkout"]
+        response = await self._request("POST", "/checkouts.json", json=checkout_data)
+        return loads(response.content)["checkout"]
     
     async def update_checkout(self, checkout_token: str, updates: Dict) -> Dict:
         """Update existing checkout"""
-        response = await self.http_client.put(
+        response = await self._request(
+            "PUT",
             f"/checkouts/{checkout_token}.json",
             json={"checkout": updates}
         )
-        response.raise_for_status()
-        return response.json()["checkout"]
+        return loads(response.content)["checkout"]
     
     async def create_customer(self, customer_data: Dict) -> Dict:
         """Create a new customer"""
-        response = await self.http_client.post(
+        response = await self._request(
+            "POST",
             "/customers.json",
             json={"customer": customer_data}
         )
-        response.raise_for_status()
-        return response.json()["customer"]
+        return loads(response.content)["customer"]
     
     async def get_customer(self, customer_id: str) -> Dict:
         """Get customer by ID"""
-        response = await self.http_client.get(f"/customers/{customer_id}.json")
-        response.raise_for_status()
-        return response.json()["customer"]
+        data = await self._get(f"/customers/{customer_id}.json")
+        return data["customer"]
+    
+    async def update_customer(self, customer_id: str, updates: Dict) -> Dict:
+        """Update existing customer"""
+        response = await self._request(
+            "PUT",
+            f"/customers/{customer_id}.json",
+            json={"customer": updates}
+        )
+        return loads(response.content)["customer"]
     
     async def search_customers(self, email: str) -> List[Dict]:
         """Search customers by email"""
-        response = await self.http_client.get(
+        data = await self._get(
             "/customers/search.json",
             params={"query": f"email:{email}"}
         )
-        response.raise_for_status()
-        return response.json()["customers"]
+        return data["customers"]
     
-    async def get_orders(self, customer_id: Optional[str] = None, status: Optional[str] = None) -> List[Dict]:
+    async def iter_customers(
+        self,
+        email: str,
+        page_size: int = 250,
+        priority: RequestPriority = RequestPriority.BACKGROUND
+    ) -> AsyncIterator[List[Dict]]:
+        """Iterate over every customer matching email, one page at a time"""
+        params = {"query": f"email:{email}", "limit": page_size}
+        async for page in self._iter_pages("/customers/search.json", "customers", params, priority):
+            yield page
+    
+    async def get_orders(
+        self,
+        customer_id: Optional[str] = None,
+        status: Optional[str] = None,
+        priority: RequestPriority = RequestPriority.INTERACTIVE
+    ) -> List[Dict]:
         """Get orders with optional filters"""
         params = {}
         if customer_id:
             params["customer_id"] = customer_id
         if status:
             params["status"] = status
-            
-        response = await self.http_client.get("/orders.json", params=params)
-        response.raise_for_status()
-        return response.json()["orders"]
+        
+        data = await self._get("/orders.json", priority, params=params)
+        return data["orders"]
+    
+    async def iter_orders(
+        self,
+        customer_id: Optional[str] = None,
+        status: Optional[str] = None,
+        page_size: int = 250,
+        priority: RequestPriority = RequestPriority.BACKGROUND
+    ) -> AsyncIterator[List[Dict]]:
+        """Iterate over every order matching the filters, one page at a time"""
+        params = {"limit": page_size}
+        if customer_id:
+            params["customer_id"] = customer_id
+        if status:
+            params["status"] = status
+        
+        async for page in self._iter_pages("/orders.json", "orders", params, priority):
+            yield page
     
     async def get_order(self, order_id: str) -> Dict:
         """Get single order by ID"""
-        response = await self.http_client.get(f"/orders/{order_id}.json")
-        response.raise_for_status()
-        return response.json()["order"]
+        data = await self._get(f"/orders/{order_id}.json")
+        return data["order"]
     
     async def create_draft_order(self, draft_order_data: Dict) -> Dict:
         """Create a draft order for will-call or special orders"""
-        response = await self.http_client.post(
+        response = await self._request(
+            "POST",
             "/draft_orders.json",
             json={"draft_order": draft_order_data}
         )
-        response.raise_for_status()
-        return response.json()["draft_order"]
+        return loads(response.content)["draft_order"]
     
     async def get_shipping_zones(self) -> List[Dict]:
         """Get shipping zones and rates"""
-        response = await self.http_client.get("/shipping_zones.json")
-        response.raise_for_status()
-        return response.json()["shipping_zones"]
+        data = await self._get("/shipping_zones.json")
+        return data["shipping_zones"]
     
     async def calculate_shipping(self, checkout_token: str, shipping_address: Dict) -> List[Dict]:
         """Calculate shipping rates for a checkout"""
-        response = await self.http_client.put(
+        await self._request(
+            "PUT",
             f"/checkouts/{checkout_token}.json",
             json={"checkout": {"shipping_address": shipping_address}}
         )
-        response.raise_for_status()
         
         # Get shipping rates
-        rates_response = await self.http_client.get(
+        rates_response = await self._request(
+            "GET",
             f"/checkouts/{checkout_token}/shipping_rates.json"
         )
-        rates_response.raise_for_status()
-        return rates_response.json()["shipping_rates"]
+        return loads(rates_response.content)["shipping_rates"]
+    
+    async def graphql(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """Run a GraphQL Admin API query.
+        
+        GraphQL calls are throttled by query cost rather than the REST call
+        bucket, so they are not paced by the rate limiter.
+        """
+        response = await self.http_client.post(
+            "/graphql.json",
+            json={"query": query, "variables": variables or {}}
+        )
+        response.raise_for_status()
+        result = loads(response.content)
+        if result.get("errors"):
+            raise RuntimeError(f"Shopify GraphQL error: {result['errors']}")
+        return result["data"]
+    
+    async def _iter_pages(
+        self,
+        url: str,
+        key: str,
+        params: Dict,
+        priority: RequestPriority = RequestPriority.BACKGROUND
+    ) -> AsyncIterator[List[Dict]]:
+        """Follow Shopify's Link rel="next" page_info cursors.
+        
+        The next page is requested as soon as the current one arrives, so
+        the network round trip overlaps with the caller consuming the page.
+        Only one page is held at a time.
+        """
+        pending = asyncio.ensure_future(self._request("GET", url, priority, params=params))
+        try:
+            while pending is not None:
+                response = await pending
+                
+                # The next link already carries limit and page_info
+                next_url = response.links.get("next", {}).get("url")
+                pending = asyncio.ensure_future(self._request("GET", next_url, priority)) if next_url else None
+                
+                yield loads(response.content)[key]
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+    
+    async def _get_all_pages(
+        self,
+        url: str,
+        key: str,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
+        page_size: int = 250
+    ) -> List[Dict]:
+        """Every item of a paginated list, for lists small enough to hold at once"""
+        items = []
+        async for page in self._iter_pages(url, key, {"limit": page_size}, priority):
+            items.extend(page)
+        return items
     
     async def verify_webhook(self, data: bytes, hmac_header: str) -> bool:
         """Verify Shopify webhook signature"""
@@ -156,7 +738,7 @@ class ShopifyClient:
         
         if not settings.SHOPIFY_WEBHOOK_SECRET:
             return False
-            
+        
         calculated_hmac = base64.b64encode(
             hmac.new(
                 settings.SHOPIFY_WEBHOOK_SECRET.encode('utf-8'),
@@ -169,7 +751,9 @@ class ShopifyClient:
     
     async def close(self):
         """Close HTTP client"""
-        await self.http_client.aclose()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
 
 
-shopify_client = ShopifyClient()
\ No newline at end of file
+shopify_client = ShopifyClient()
@@ -0,0 +1,112 @@
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+from ..config import settings
+from .cache import catalog_cache
+from .catalog import CatalogStore, catalog_store, project_product
+from .shopify_client import shopify_client
+import httpx
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def variant_entries(projection: Dict) -> List[Dict]:
+    """Everything the cart needs about each variant of a product"""
+    images = {img["id"]: img["src"] for img in projection["images"]}
+    first_image = projection["images"][0]["src"] if projection["images"] else None
+    return [
+        {
+            "variant_id": v["id"],
+            "product_id": projection["id"],
+            "product_title": projection["title"],
+            "variant_title": v["title"],
+            "sku": v.get("sku"),
+            "price": v["price"],
+            "image_url": images.get(v.get("image_id"), first_image),
+            "available": v["available"]
+        }
+        for v in projection["variants"]
+    ]
+
+
+class VariantIndex:
+    """Variant ID to cart line details for every product in the mirror.
+    
+    Lets add-to-cart resolve a variant without calling Shopify. Follows
+    product webhooks and is rebuilt from the mirror after a sync and every
+    ``refresh_interval`` seconds, like the other catalog indexes.
+    """
+    
+    def __init__(self, store: CatalogStore, refresh_interval: float = 30):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self._variants: Dict[str, Dict] = {}
+        self._by_product: Dict[str, List[str]] = {}
+        self._built_at: Optional[float] = None
+    
+    def invalidate(self):
+        """Force a rebuild on next use"""
+        self._built_at = None
+    
+    def ensure_fresh(self, db: Session):
+        if self._built_at is None or time.monotonic() - self._built_at > self.refresh_interval:
+            self.rebuild(self.store.index_entries(db))
+    
+    def rebuild(self, entries: Iterable[Dict]):
+        self._variants = {}
+        self._by_product = {}
+        for entry in entries:
+            self.add(entry["projection"])
+        self._built_at = time.monotonic()
+    
+    def add(self, projection: Dict, collections: Optional[Iterable[str]] = None):
+        self.remove(projection["id"])
+        variants = variant_entries(projection)
+        for variant in variants:
+            self._variants[variant["variant_id"]] = variant
+        self._by_product[projection["id"]] = [v["variant_id"] for v in variants]
+    
+    def remove(self, product_id: str):
+        for variant_id in self._by_product.pop(str(product_id), []):
+            self._variants.pop(variant_id, None)
+    
+    def get(self, variant_id: str) -> Optional[Dict]:
+        return self._variants.get(str(variant_id))
+
+
+async def _fetch_variant(variant_id: str) -> Optional[Dict]:
+    try:
+        variant = await shopify_client.get_variant(variant_id)
+        product = await shopify_client.get_product(variant["product_id"])
+    except httpx.HTTPStatusError as e:
+        # Unknown to Shopify (or deleted since), which the cart reports as a 404
+        if e.response.status_code == 404:
+            return None
+        raise
+    for entry in variant_entries(project_product(product)):
+        if entry["variant_id"] == str(variant_id):
+            return entry
+    return None
+
+
+async def resolve_variant(db: Session, variant_id: str) -> Optional[Dict]:
+    """Cart line details for a variant, from the mirror when possible.
+    
+    Falls back to Shopify (through the catalog cache) before the first sync
+    or for variants the mirror hasn't seen yet.
+    """
+    if catalog_store.is_loaded(db):
+        variant_index.ensure_fresh(db)
+        entry = variant_index.get(variant_id)
+        if entry:
+            return entry
+    
+    return await catalog_cache.get_or_load(
+        f"products:variant:{variant_id}",
+        lambda: _fetch_variant(variant_id)
+    )
+
+
+variant_index = VariantIndex(catalog_store, refresh_interval=settings.CATALOG_INDEX_REFRESH_SECONDS)
+catalog_store.subscribe(variant_index)
@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional
+from fastapi import Request, Response
+from starlette.datastructures import MutableHeaders
+from ..config import settings
+from ..services.cache import stale_marker
+import hashlib
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the given version parts.
+    
+    The app version is mixed in so a deploy that changes how responses are
+    built invalidates every tag.
+    """
+    digest = hashlib.sha1(settings.VERSION.encode())
+    for part in parts:
+        digest.update(b"\x1f")
+        digest.update(str(part).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def latest(timestamps: Iterable[Any]) -> Optional[datetime]:
+    """Most recent of the given timestamps, for Last-Modified"""
+    values = [ts for ts in (_as_datetime(value) for value in timestamps) if ts]
+    return max(values) if values else None
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison (RFC 9110 13.1.2)
+    if header.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+    return False
+
+
+def conditional(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """Set validators on the response and answer 304 when the client is current.
+    
+    Returns the 304 response for the endpoint to return as-is, or None when
+    the full body should be sent.
+    """
+    headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return None
+
+
+class StaleResponseMiddleware:
+    """Mark responses built from stale cached data with ``X-Cache-Status: stale``"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        marker = {"stale": False}
+        token = stale_marker.set(marker)
+        
+        async def send_with_marker(message):
+            if message["type"] == "http.response.start" and marker["stale"]:
+                MutableHeaders(scope=message)["X-Cache-Status"] = "stale"
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_marker)
+        finally:
+            stale_marker.reset(token)
@@ -0,0 +1,30 @@
+from decimal import Decimal
+from typing import Any
+from fastapi.encoders import decimal_encoder
+from fastapi.responses import Response
+import orjson
+
+
+def _default(obj: Any) -> Any:
+    # Match FastAPI's own encoder so responses keep their shape
+    if isinstance(obj, Decimal):
+        return decimal_encoder(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def loads(data: Any) -> Any:
+    return orjson.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes; datetimes use ISO 8601 and Decimals become numbers"""
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson"""
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
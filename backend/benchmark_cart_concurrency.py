@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Hammer one cart with concurrent adds and check that no line or increment is lost
+"""
+
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the app directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+VARIANTS = [
+    {
+        "product_id": "100",
+        "variant_id": f"bench-{n}",
+        "product_title": "Original Hawaiian Beef Chips",
+        "variant_title": f"{n + 1}-pack",
+        "sku": None,
+        "price": str(round(13.99 * (n + 1), 2)),
+        "image_url": None
+    }
+    for n in range(2)
+]
+
+
+def add_items(cart_id, adds):
+    """Add one of each variant per round, the way POST /cart/items does"""
+    from sqlalchemy.orm import selectinload
+    from app.database import SessionLocal
+    from app.models.cart import CartSession
+    from app.routers.cart import lock_cart_lines, update_totals, upsert_line
+    
+    for _ in range(adds):
+        for variant in VARIANTS:
+            with SessionLocal() as db:
+                cart = db.query(CartSession).options(selectinload(CartSession.items)).filter(
+                    CartSession.id == cart_id
+                ).first()
+                lock_cart_lines(db, cart)
+                upsert_line(db, cart, variant, 1)
+                update_totals(db, cart)
+                db.commit()
+
+
+def main(workers=8, adds=25):
+    from app.database import SessionLocal, engine
+    from app.migrations import ensure_schema
+    from app.models.cart import CartSession
+    
+    ensure_schema(engine)
+    with SessionLocal() as db:
+        cart = CartSession(session_id=f"bench-{uuid.uuid4()}", is_active=True)
+        db.add(cart)
+        db.commit()
+        cart_id = cart.id
+    
+    print(f"🛒 {workers} workers adding each of {len(VARIANTS)} variants {adds} times")
+    print("-" * 50)
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(add_items, cart_id, adds) for _ in range(workers)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    print(f"{workers * adds * len(VARIANTS)} adds in {elapsed * 1000:.0f} ms")
+    
+    failures = 0
+    with SessionLocal() as db:
+        cart = db.get(CartSession, cart_id)
+        for variant in VARIANTS:
+            lines = [item for item in cart.items if item.shopify_variant_id == variant["variant_id"]]
+            quantity = sum(item.quantity for item in lines)
+            ok = len(lines) == 1 and quantity == workers * adds
+            failures += not ok
+            print(f"{variant['variant_id']:12} {len(lines)} line(s), quantity {quantity:4} {'✅' if ok else '❌'}")
+        
+        expected = round(sum(float(item.line_total) for item in cart.items), 2)
+        ok = float(cart.subtotal) == expected and float(cart.total_amount) == expected
+        failures += not ok
+        print(f"{'subtotal':12} {cart.subtotal} (lines sum to {expected}) {'✅' if ok else '❌'}")
+        
+        db.delete(cart)
+        db.commit()
+    
+    print("-" * 50)
+    print("✅ No lost updates" if not failures else f"❌ {failures} check(s) failed")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main(*(int(arg) for arg in sys.argv[1:3])) else 0)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Count the SQL statements each cart request issues against the configured database
+"""
+
+import os
+import sys
+import uuid
+from collections import Counter
+
+# Add the app directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Statements allowed per request (authentication not included). Writes
+# include the cart row lock that serializes concurrent changes to a cart.
+BUDGETS = {
+    "GET /cart (cached)": 0,
+    "GET /cart (uncached)": 2,
+    "PUT /cart/items/{id}": 7,
+    "DELETE /cart/items/{id}": 7,
+}
+
+
+def make_cart(db, lines=3):
+    from app.models.cart import CartSession, CartItem
+    
+    cart = CartSession(session_id=f"bench-{uuid.uuid4()}", is_active=True)
+    for n in range(lines):
+        cart.items.append(CartItem(
+            shopify_product_id=str(100 + n),
+            shopify_variant_id=str(1000 + n),
+            product_title=f"Beef Chips #{n}",
+            quantity=2,
+            price=13.99,
+            line_total=27.98
+        ))
+    cart.subtotal = cart.total_amount = round(27.98 * lines, 2)
+    db.add(cart)
+    db.commit()
+    return cart.id, cart.session_id, [item.id for item in cart.items]
+
+
+def main():
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from app.database import SessionLocal, engine
+    from app.main import app
+    from app.migrations import ensure_schema
+    from app.models.cart import CartSession
+    from app.utils.auth import get_current_active_user
+    
+    ensure_schema(engine)
+    with SessionLocal() as db:
+        cart_id, session_id, item_ids = make_cart(db)
+    
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    
+    # Measure the cart queries, not the user lookup behind the bearer token
+    app.dependency_overrides[get_current_active_user] = lambda: None
+    client = TestClient(app, cookies={"cart_session_id": session_id})
+    
+    def measure(label, method, path, **kwargs):
+        statements.clear()
+        response = client.request(method, path, **kwargs)
+        response.raise_for_status()
+        kinds = Counter(sql.split(None, 1)[0].upper() for sql in statements)
+        summary = ", ".join(f"{count} {kind}" for kind, count in sorted(kinds.items())) or "none"
+        budget = BUDGETS.get(label)
+        status = "" if budget is None else ("✅" if len(statements) <= budget else f"❌ budget {budget}")
+        print(f"{label:24} {len(statements):2} statements ({summary}) {status}")
+        return response.json(), kinds
+    
+    print("🛒 Cart request SQL statements")
+    print("-" * 50)
+    
+    failures = 0
+    cold, kinds = measure("GET /cart (uncached)", "GET", "/api/v1/cart/")
+    failures += len(statements) > BUDGETS["GET /cart (uncached)"]
+    if kinds.keys() - {"SELECT"}:
+        print("❌ GET /cart wrote to the database")
+        failures += 1
+    
+    warm, _ = measure("GET /cart (cached)", "GET", "/api/v1/cart/")
+    failures += len(statements) > BUDGETS["GET /cart (cached)"]
+    if warm != cold:
+        print("❌ Cached cart differs from the database copy")
+        failures += 1
+    
+    updated, _ = measure("PUT /cart/items/{id}", "PUT", f"/api/v1/cart/items/{item_ids[0]}", json={"quantity": 5})
+    failures += len(statements) > BUDGETS["PUT /cart/items/{id}"]
+    expected = round(13.99 * 5 + 27.98 * (len(item_ids) - 1), 2)
+    if float(updated["subtotal"]) != expected or float(updated["total_amount"]) != expected:
+        print(f"❌ Totals after update: {updated['subtotal']} / {updated['total_amount']}, expected {expected}")
+        failures += 1
+    
+    removed, _ = measure("DELETE /cart/items/{id}", "DELETE", f"/api/v1/cart/items/{item_ids[1]}")
+    failures += len(statements) > BUDGETS["DELETE /cart/items/{id}"]
+    expected = round(expected - 27.98, 2)
+    if float(removed["subtotal"]) != expected:
+        print(f"❌ Totals after removal: {removed['subtotal']}, expected {expected}")
+        failures += 1
+    
+    with SessionLocal() as db:
+        db.delete(db.get(CartSession, cart_id))
+        db.commit()
+    client.close()
+    
+    print("-" * 50)
+    print("✅ All within budget" if not failures else f"❌ {failures} check(s) failed")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Compare stdlib json and orjson on a 250-product Shopify payload
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+
+# Add the app directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+FLAVORS = ["Original", "Cracked Pepper", "Spicy", "Roasted Garlic"]
+PACKS = ["1-pack", "3-pack", "6-pack", "15-pack"]
+
+
+def make_product(i):
+    flavor = FLAVORS[i % len(FLAVORS)]
+    return {
+        "id": 7000000000 + i,
+        "title": f"{flavor} Hawaiian Beef Chips #{i}",
+        "handle": f"product-{i}",
+        "body_html": "<p>Thin-sliced, marinated and slow-dried in Kapolei. " * 8 + "</p>",
+        "vendor": "Chyler's Hawaiian Beef Chips",
+        "product_type": "Beef Chips",
+        "tags": f"{flavor.lower()}, bestseller, keto",
+        "created_at": "2024-01-01T08:00:00-10:00",
+        "updated_at": "2024-06-01T08:00:00-10:00",
+        "published_at": "2024-01-01T08:00:00-10:00",
+        "options": [{"name": "Size", "values": PACKS}],
+        "variants": [
+            {
+                "id": (7000000000 + i) * 10 + n,
+                "product_id": 7000000000 + i,
+                "title": pack,
+                "price": f"{13.99 * (n + 1):.2f}",
+                "sku": f"CHY-{i}-{n}",
+                "position": n + 1,
+                "inventory_policy": "deny",
+                "inventory_quantity": 100,
+                "option1": pack,
+                "grams": 57 * (n + 1),
+                "weight": 2.0 * (n + 1),
+                "weight_unit": "oz"
+            }
+            for n, pack in enumerate(PACKS)
+        ],
+        "images": [
+            {"id": 8000000000 + i, "src": f"https://cdn.shopify.com/s/files/chips-{i}.jpg", "position": 1}
+        ]
+    }
+
+
+def timed(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def make_app(products, response_class):
+    """A product list route as the storefront serves it, with a given response class"""
+    from typing import List
+    from fastapi import FastAPI
+    from app.schemas.shopify import ShopifyProduct
+    
+    app = FastAPI(default_response_class=response_class)
+
+    @app.get("/products", response_model=List[ShopifyProduct])
+    async def list_products():
+        return products
+    
+    return app
+
+
+def render(app) -> bytes:
+    """Run one request through the ASGI app: validation, jsonable_encoder and rendering"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/products", "raw_path": b"/products", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 0), "server": ("test", 80)
+    }
+    body = []
+    
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+    
+    asyncio.run(app(scope, receive, send))
+    return b"".join(body)
+
+
+def main(runs=200):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.schemas.shopify import ShopifyProduct
+    from app.services.catalog import project_product
+    from app.utils.serialization import FastJSONResponse, dumps, loads
+    
+    raw = json.dumps({"products": [make_product(i) for i in range(250)]}).encode()
+    print(f"📦 Payload: 250 products, {len(raw) / 1024:.0f} KiB")
+    print("-" * 50)
+    
+    before = timed(lambda: json.loads(raw), runs)
+    after = timed(lambda: loads(raw), runs)
+    print(f"Decode Shopify response   json {before:6.2f} ms  orjson {after:6.2f} ms  ({before / after:.1f}x)")
+    
+    # The whole response path: response_model validation, jsonable_encoder
+    # and rendering, before and after the orjson response class
+    products = [project_product(p) for p in loads(raw)["products"]]
+    old_app = make_app(products, JSONResponse)
+    new_app = make_app(products, FastJSONResponse)
+    before = timed(lambda: render(old_app), runs)
+    after = timed(lambda: render(new_app), runs)
+    print(f"Serve product list        json {before:6.2f} ms  orjson {after:6.2f} ms  ({before / after:.1f}x)")
+    assert json.loads(render(old_app)) == json.loads(render(new_app))
+    
+    # The renderer on its own, given what jsonable_encoder produced
+    content = jsonable_encoder([ShopifyProduct(**p) for p in products])
+    before = timed(lambda: JSONResponse(content), runs)
+    after = timed(lambda: FastJSONResponse(content), runs)
+    print(f"  of which rendering      json {before:6.2f} ms  orjson {after:6.2f} ms  ({before / after:.1f}x)")
+    
+    # Decimals and datetimes that reach the renderer unconverted
+    sample = {"price": Decimal("13.99"), "count": Decimal("3"), "at": ShopifyProduct(**products[0]).created_at}
+    assert json.loads(dumps(sample)) == jsonable_encoder(sample), "Decimal/datetime encoding"
+    print("✅ Output matches FastAPI's encoder")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark product search and autocomplete against a synthetic catalog
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add the app directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+FLAVORS = ["Original", "Cracked Pepper", "Spicy", "Roasted Garlic"]
+WORDS = ["hawaiian", "beef", "chips", "keto", "protein", "kapolei", "island", "smoked", "sweet", "teriyaki"]
+PACKS = ["1-pack", "3-pack", "6-pack", "15-pack"]
+
+
+def make_product(i, rng):
+    flavor = FLAVORS[i % len(FLAVORS)]
+    code = flavor.upper().replace(" ", "")
+    return {
+        "id": 10000 + i,
+        "title": f"{flavor} {' '.join(rng.sample(WORDS, 3)).title()} #{i}",
+        "handle": f"product-{i}",
+        "body_html": f"<p>{' '.join(rng.choices(WORDS, k=30))}</p>",
+        "tags": f"{flavor.lower()}, {rng.choice(WORDS)}",
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+        "variants": [
+            {
+                "id": (10000 + i) * 10 + n,
+                "title": pack,
+                "price": "13.99",
+                "sku": f"CHY-{code}-{i}-{n}",
+                "option1": pack
+            }
+            for n, pack in enumerate(PACKS)
+        ]
+    }
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main(size=5000, runs=200):
+    from app.services.catalog import catalog_store, project_product
+    from app.services.search import SearchIndex
+    
+    rng = random.Random(42)
+    projections = [project_product(make_product(i, rng)) for i in range(size)]
+    index = SearchIndex(catalog_store)
+    
+    start = time.perf_counter()
+    index.rebuild({"projection": p, "collections": []} for p in projections)
+    print(f"🔨 Indexed {size} products in {(time.perf_counter() - start) * 1000:.1f} ms")
+    
+    # Ranking: title hits beat description-only hits, SKUs resolve exactly
+    top = index.search("roasted garlic", limit=5)
+    assert top and all(p["flavor"] == "Roasted Garlic" for p in top), "flavor query ranking"
+    sku = projections[123]["variants"][2]["sku"]
+    assert index.search(sku, limit=1)[0]["id"] == projections[123]["id"], "SKU lookup"
+    assert "teriyaki" in index.suggest("teri")["terms"], "autocomplete"
+    print("✅ Ranking checks passed")
+    
+    print("-" * 50)
+    queries = ["garlic", "spicy beef", "keto protein chips", "chy-original", "hawaiian is"]
+    for query in queries:
+        p50, p95 = timed(lambda: index.search(query, limit=20), runs)
+        print(f"🔎 search {query!r:24} p50 {p50:6.2f} ms  p95 {p95:6.2f} ms")
+    for prefix in ["g", "sp", "teri", "roasted g"]:
+        p50, p95 = timed(lambda: index.suggest(prefix, limit=8), runs)
+        print(f"⌨️  suggest {prefix!r:23} p50 {p50:6.2f} ms  p95 {p95:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Measure cold-start import time of the API and what it no longer loads eagerly
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Imported on first use (or not at all) instead of at startup
+LAZY_MODULES = ["shopify", "jinja2", "aiosmtplib"]
+
+
+def import_ms(statement, runs):
+    """Median wall time of running statement in a fresh interpreter"""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; print((time.perf_counter() - start) * 1000)"
+    )
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def loaded_after_startup():
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return [m for m in output.strip().split(",") if m]
+
+
+def main(runs=5):
+    print(f"⏱️  import app.main: {import_ms('import app.main', runs):.0f} ms (median of {runs})")
+    print("-" * 50)
+    
+    loaded = loaded_after_startup()
+    for module in LAZY_MODULES:
+        try:
+            cost = f"{import_ms(f'import {module}', runs):.0f} ms"
+        except subprocess.CalledProcessError:
+            cost = "not installed"
+        status = "❌ loaded at startup" if module in loaded else "✅ deferred"
+        print(f"{module:12} {cost:>14}  {status}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
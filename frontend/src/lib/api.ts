@@ -94,6 +94,8 @@ export const cartApi = {
   updateItem: (itemId: number, quantity: number) => 
     api.put(`/cart/items/${itemId}`, { quantity }),
   removeItem: (itemId: number) => api.delete(`/cart/items/${itemId}`),
+  updateItems: (operations: Array<{ op: 'add' | 'set' | 'remove'; variant_id: string; quantity?: number; properties?: any }>) =>
+    api.patch('/cart/items', { operations }),
   clear: () => api.delete('/cart'),
   applyDiscount: (code: string) => api.post('/cart/discount', { discount_code: code }),
   calculateShipping: (address: any) => api.post('/cart/shipping-rates', address),
@@ -86,8 +86,9 @@ export interface CartItem {
 }
 
 export interface Cart {
-  id: number
-  session_id: string
+  // Unset until the first item is added
+  id?: number
+  session_id?: string
   user_id?: number
   shopify_checkout_id?: string
   shopify_checkout_token?: string
@@ -100,7 +101,7 @@ export interface Cart {
   discount_codes: string[]
   is_active: boolean
   expires_at?: string
-  created_at: string
+  created_at?: string
   updated_at?: string
   items: CartItem[]
   items_count: number